@@ -0,0 +1,60 @@
+"""
+ASGI entry point for the async serving mode.
+
+The hot read endpoints (the student, program and college lists,
+statistics and /api/auth/me) are served by a Quart app on asyncio, with
+an async Postgres pool: a request waiting on the database holds no thread.
+Every other route, writes included, is handed to the regular Flask app
+running in a thread, so all JSON contracts stay exactly the same.
+
+Run with an ASGI server, from the backend directory:
+
+    uvicorn aio.asgi:app --workers 4
+"""
+from asgiref.wsgi import WsgiToAsgi
+from quart import Quart
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from aio.db import close_pool, open_pool
+from aio.routes import api_bp
+from app import create_app
+
+def create_async_app(flask_app):
+    quart_app = Quart(__name__)
+    quart_app.config['JWT_SECRET_KEY'] = flask_app.config['JWT_SECRET_KEY']
+    quart_app.register_blueprint(api_bp)
+
+    @quart_app.before_serving
+    async def startup():
+        await open_pool()
+
+    @quart_app.after_serving
+    async def shutdown():
+        await close_pool()
+
+    return quart_app
+
+class Dispatcher:
+    """Sends each HTTP request to the async app if it has a matching route, else to the WSGI app."""
+
+    def __init__(self, async_app, wsgi_app):
+        self.async_app = async_app
+        self.wsgi_app = WsgiToAsgi(wsgi_app)
+
+    def _handles(self, scope):
+        adapter = self.async_app.url_map.bind('', url_scheme=scope.get('scheme', 'http'))
+        try:
+            adapter.match(scope['path'], method=scope['method'])
+        except (NotFound, MethodNotAllowed):
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        # Lifespan events go to Quart, which opens and closes the async pool
+        if scope['type'] == 'lifespan' or (scope['type'] == 'http' and self._handles(scope)):
+            await self.async_app(scope, receive, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+
+flask_app = create_app()
+async_app = create_async_app(flask_app)
+app = Dispatcher(async_app, flask_app)
@@ -0,0 +1,31 @@
+"""
+Access-token checks for the async routes.
+
+flask_jwt_extended needs a Flask app context, so tokens are verified here
+directly with PyJWT, using the same secret, algorithm and error responses
+as the WSGI app.
+"""
+import functools
+import jwt
+from quart import current_app, g, jsonify, request
+
+def jwt_required(view):
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return jsonify({'error': 'Missing authorization token'}), 401
+        try:
+            claims = jwt.decode(
+                header[len('Bearer '):], current_app.config['JWT_SECRET_KEY'],
+                algorithms=[current_app.config.get('JWT_ALGORITHM', 'HS256')]
+            )
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token has expired'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'error': 'Invalid token'}), 401
+        if claims.get('type') != 'access':
+            return jsonify({'error': 'Invalid token'}), 401
+        g.jwt = claims
+        return await view(*args, **kwargs)
+    return wrapper
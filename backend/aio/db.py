@@ -0,0 +1,66 @@
+"""
+Async counterpart of db.get_connection, on a psycopg 3 connection pool.
+
+Connections use client-side parameter binding and dict rows, so the SQL
+built by the services (psycopg2 style %s placeholders) runs unchanged
+and rows have the same shape as RealDictCursor rows.
+"""
+import os
+from contextlib import asynccontextmanager
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+_pool = None
+
+def _conninfo():
+    db_url = os.getenv('DATABASE_URL')
+    if db_url:
+        return db_url
+    return make_conninfo(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'postgres'),
+        password=os.getenv('DB_PASSWORD', ''),
+        dbname=os.getenv('DB_NAME', 'sis_db'),
+        port=os.getenv('DB_PORT', 5432)
+    )
+
+async def open_pool():
+    """Opens the process-wide async pool. Sized by the same DB_POOL_* variables as db.get_pool."""
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(
+            _conninfo(),
+            min_size=int(os.getenv('DB_POOL_MIN', 1)),
+            max_size=int(os.getenv('DB_POOL_MAX', 10)),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            max_idle=float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+            kwargs={'row_factory': dict_row, 'cursor_factory': psycopg.AsyncClientCursor},
+            open=False
+        )
+        await _pool.open()
+    return _pool
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+@asynccontextmanager
+async def get_connection():
+    """Checks a connection out of the async pool for an ``async with`` block."""
+    pool = await open_pool()
+    async with pool.connection() as conn:
+        yield conn
+
+async def fetchall(query, params=()):
+    async with get_connection() as conn:
+        cursor = await conn.execute(query, tuple(params))
+        return await cursor.fetchall()
+
+async def fetchone(query, params=()):
+    async with get_connection() as conn:
+        cursor = await conn.execute(query, tuple(params))
+        return await cursor.fetchone()
@@ -0,0 +1,101 @@
+"""
+Async versions of services.pagination.offset_page and keyset_page.
+
+They build the same SQL and return the same page dicts. Statements that
+do not depend on each other (a page and its count) run concurrently on
+separate pooled connections.
+"""
+import asyncio
+import json
+import math
+from aio.db import fetchall, fetchone
+from services.pagination import check_count_mode, decode_cursor, encode_cursor, keyset_condition, order_by_clause
+
+async def count_rows(query, params, count='exact'):
+    """Async services.pagination.count_rows."""
+    if count == 'none':
+        return None
+    if count == 'estimate':
+        row = await fetchone(f"EXPLAIN (FORMAT JSON) {query}", params)
+        plan = row['QUERY PLAN']
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    row = await fetchone(f"SELECT COUNT(*) as total FROM ({query}) as subquery", params)
+    return row['total']
+
+async def offset_page(select, body, order_by, params, page, per_page, count='exact'):
+    check_count_mode(count)
+    offset = (page - 1) * per_page
+    window = ", COUNT(*) OVER() as total_count" if count == 'exact' else ""
+    page_query = fetchall(
+        f"{select}{window} {body} {order_by} LIMIT %s OFFSET %s",
+        tuple(params) + (per_page + 1, offset)
+    )
+    if count == 'estimate':
+        items, total = await asyncio.gather(page_query, count_rows(f"{select} {body}", params, 'estimate'))
+    else:
+        items, total = await page_query, None
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if count == 'exact':
+        if items:
+            total = items[0]['total_count']
+            for item in items:
+                del item['total_count']
+        elif page > 1:
+            total = await count_rows(f"{select} {body}", params)
+        else:
+            total = 0
+    elif count == 'estimate':
+        if not has_more:
+            total = offset + len(items) if items else min(total, offset)
+        else:
+            total = max(total, offset + len(items) + 1)
+
+    return {
+        'items': items,
+        'total': total,
+        'pages': math.ceil(total / per_page) if total is not None else None,
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    }
+
+async def keyset_page(select, body, conditions, params, per_page, token, order, count='exact'):
+    check_count_mode(count)
+    position = decode_cursor(token, order)
+    query = f"{select} {body}"
+
+    count_query = query
+    if conditions:
+        count_query += " WHERE " + " AND ".join(conditions)
+
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if position is not None:
+        condition, condition_params = keyset_condition(order, position)
+        page_conditions.append(condition)
+        page_params.extend(condition_params)
+
+    if page_conditions:
+        query += " WHERE " + " AND ".join(page_conditions)
+    query += " " + order_by_clause(order)
+    query += " LIMIT %s"
+    page_params.append(per_page + 1)
+
+    items, total = await asyncio.gather(fetchall(query, page_params), count_rows(count_query, params, count))
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(order, [last[name] for name, _, _, _ in order])
+
+    return {
+        'items': items,
+        'total': total,
+        'per_page': per_page,
+        'next_cursor': next_cursor
+    }
@@ -0,0 +1,122 @@
+import functools
+from quart import Blueprint, Response, current_app, g, jsonify, request
+from werkzeug.sansio.http import is_resource_modified
+from aio import services
+from aio.auth import jwt_required
+from auth import CLAIM_FIELDS
+from routes.conditional import version_validators
+from services.list_query import parse_filters
+from services.pagination import check_page
+
+api_bp = Blueprint('aio_api', __name__)
+
+# Same defaults as the WSGI list routes
+DEFAULT_SORT = {'students': 'id', 'programs': 'code', 'colleges': 'code'}
+# Tables each list is built from (see the routes' conditional_get)
+LIST_TABLES = {
+    'students': ('students', 'programs', 'colleges'),
+    'programs': ('programs', 'colleges'),
+    'colleges': ('colleges',),
+}
+
+def conditional_get(*tables):
+    """Async routes.conditional.conditional_get."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            etag, last_modified = version_validators(await services.get_table_versions(tables), tables)
+            unmodified = not is_resource_modified(
+                http_if_modified_since=request.headers.get('If-Modified-Since'),
+                http_if_none_match=request.headers.get('If-None-Match'),
+                etag=etag, last_modified=last_modified
+            )
+            if unmodified:
+                response = Response('', status=304)
+            else:
+                response = await current_app.make_response(await view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+async def list_response(resource):
+    args = request.args
+    search = args.get('search', '').strip()
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 10, type=int)
+    sort_by = args.get('sort_by', DEFAULT_SORT[resource])
+    sort_order = args.get('sort_order', 'asc')
+    page_cursor = args.get('cursor')
+    count = args.get('count', 'exact')
+    fields = args.get('fields')
+
+    try:
+        check_page(None if page_cursor is not None else page, per_page)
+        filters = parse_filters(services.RESOURCES[resource], args)
+        if page_cursor is not None:
+            result = await services.get_all(resource, search, None, per_page, sort_by, sort_order, filters,
+                                            page_cursor=page_cursor, count=count, fields=fields)
+            return jsonify({
+                'data': result['items'],
+                'meta': {
+                    'per_page': result['per_page'],
+                    'total_items': result['total'],
+                    'next_cursor': result['next_cursor']
+                }
+            })
+        result = await services.get_all(resource, search, page, per_page, sort_by, sort_order, filters,
+                                        count=count, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'data': result['items'],
+        'meta': {
+            'page': result['page'],
+            'per_page': result['per_page'],
+            'total_pages': result['pages'],
+            'total_items': result['total'],
+            'has_more': result['has_more']
+        }
+    })
+
+@api_bp.route('/api/students', methods=['GET'])
+@jwt_required
+@conditional_get(*LIST_TABLES['students'])
+async def get_students():
+    return await list_response('students')
+
+@api_bp.route('/api/programs', methods=['GET'])
+@jwt_required
+@conditional_get(*LIST_TABLES['programs'])
+async def get_programs():
+    return await list_response('programs')
+
+@api_bp.route('/api/colleges', methods=['GET'])
+@jwt_required
+@conditional_get(*LIST_TABLES['colleges'])
+async def get_colleges():
+    return await list_response('colleges')
+
+@api_bp.route('/api/statistics', methods=['GET'])
+@jwt_required
+async def get_statistics():
+    return jsonify(await services.get_statistics())
+
+@api_bp.route('/api/auth/me', methods=['GET'])
+@jwt_required
+async def get_current_user():
+    claims = g.jwt
+    if all(field in claims for field in CLAIM_FIELDS):
+        user = {field: claims[field] for field in CLAIM_FIELDS}
+        user['id'] = int(claims['sub'])
+        return jsonify(user), 200
+    user = await services.get_user(claims['sub'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify(user), 200
@@ -0,0 +1,70 @@
+"""
+Async read paths of the services. The SQL comes from the services' list
+declarations (services/list_query.py), so filters, search and sort rules
+stay in one place.
+
+The async list path is not an exact copy of the sync one: it does not go
+through the query result cache (cached_query), its SQL and request
+timings are not recorded by the metrics instrumentation, and the lists
+do not support ?stream. Statistics share the sync path's cache through
+statistics_service's guarded helpers.
+"""
+import asyncio
+from aio.db import fetchall, fetchone
+from aio.pagination import keyset_page, offset_page
+from cache import MISSING
+from services.college_service import CollegeService
+from services.program_service import ProgramService
+from services.student_service import StudentService
+from services import list_query, statistics_service
+
+RESOURCES = {
+    'students': StudentService.RESOURCE,
+    'programs': ProgramService.RESOURCE,
+    'colleges': CollegeService.RESOURCE,
+}
+
+async def get_all(resource, search_term=None, page=None, per_page=None, sort_by=None, sort_order='asc',
+                  filters=(), page_cursor=None, count='exact', fields=None):
+    """
+    Async get_all_students / get_all_programs / get_all_colleges for
+    ``resource``, with the same arguments and return values.
+    """
+    query = list_query.build(
+        RESOURCES[resource], search_term, sort_by, sort_order, filters, fields, keyset=page_cursor is not None
+    )
+    if page_cursor is not None and per_page is not None:
+        result = await keyset_page(
+            query.select, query.body, query.conditions, query.params, per_page, page_cursor, query.order, count
+        )
+    elif page is not None and per_page is not None:
+        result = await offset_page(query.select, query.where_body(), query.order_by, query.params, page, per_page, count)
+    else:
+        result = await fetchall(f"{query.select} {query.where_body()} {query.order_by}", query.params)
+
+    if query.resolve is not None:
+        # Usually answered from memory, but a stale copy reloads through the sync pool
+        await asyncio.to_thread(query.finish, result)
+    return result
+
+async def get_statistics():
+    """Async StatisticsService.get_statistics, sharing its cache."""
+    statistics = statistics_service.cached_statistics()
+    if statistics is MISSING:
+        generation = statistics_service.current_generation()
+        statistics = dict(await fetchone(statistics_service.STATISTICS_QUERY))
+        statistics_service.cache_statistics(generation, statistics)
+    return statistics
+
+async def get_table_versions(tables):
+    """Async db.get_table_versions."""
+    rows = await fetchall(
+        "SELECT table_name, version, changed_at FROM table_versions WHERE table_name = ANY(%s)",
+        (list(tables),)
+    )
+    return {row['table_name']: (row['version'], row['changed_at']) for row in rows}
+
+async def get_user(user_id):
+    return await fetchone(
+        "SELECT id, username, email, full_name, role, created_at FROM users WHERE id = %s", (user_id,)
+    )
@@ -1,93 +1,165 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from werkzeug.security import generate_password_hash
-from db import get_db_connection, init_db
+from db import get_db_connection, init_db, check_indexes, reconcile_counters
 from psycopg2.extras import RealDictCursor
 from auth import auth_bp
 from routes.colleges import colleges_bp
 from routes.programs import programs_bp
 from routes.students import students_bp
 from routes.statistics import statistics_bp
+from routes.system import system_bp
+from routes.metrics import metrics_bp
+from routes.events import events_bp
+from routes.lookup import lookup_bp
+from routes.frontend import frontend_bp
+import metrics
+import change_feed
+import json_provider
 import os
+import time
+import click
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = Flask(__name__, static_folder='./dist', static_url_path='/')
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
+# Arbitrary key shared by everything that bootstraps the schema, so
+# concurrent deploys or workers run it one at a time
+BOOTSTRAP_LOCK_ID = 181_000_001
 
-CORS(app)
-jwt = JWTManager(app)
+def bootstrap_database():
+    """
+    Creates the schema and the default admin user, then verifies the
+    indexes. Holds a Postgres advisory lock while doing so, so it is safe
+    to run from several processes at once.
 
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(colleges_bp, url_prefix='/api/colleges')
-app.register_blueprint(programs_bp, url_prefix='/api/programs')
-app.register_blueprint(students_bp, url_prefix='/api/students')
-app.register_blueprint(statistics_bp, url_prefix='/api/statistics')
-
-# Create tables
-with app.app_context():
-    init_db()
-    
-    # Create default admin user if none exists
+    It can run before or after ``flask db upgrade``: init_db brings an
+    older database up to the current schema itself (adding and
+    backfilling the counter columns), and the migrations skip whatever
+    it has already created.
+    """
     conn = get_db_connection()
+    conn.autocommit = True
     cursor = conn.cursor(cursor_factory=RealDictCursor)
-    cursor.execute("SELECT * FROM users WHERE username = %s", ('admin',))
-    admin = cursor.fetchone()
-    
-    if not admin:
-        password_hash = generate_password_hash('admin123')
-        cursor.execute("""
-            INSERT INTO users (username, email, full_name, role, password_hash)
-            VALUES (%s, %s, %s, %s, %s)
-        """, ('admin', 'admin@example.com', 'System Administrator', 'admin', password_hash))
-        conn.commit()
-        print("✓ Default admin user created (username: admin, password: admin123)")
-    
-    cursor.close()
-    conn.close()
-    
-    print("✓ Database tables created successfully!")
-
-# Add JWT error handlers
-@jwt.invalid_token_loader
-def invalid_token_callback(error):
-    try:
-        auth_hdr = request.headers.get('Authorization')
-    except Exception:
-        auth_hdr = None
-    print('JWT invalid_token_loader called:', error, 'Authorization header:', auth_hdr)
-    return jsonify({'error': 'Invalid token'}), 401
-
-@jwt.unauthorized_loader
-def unauthorized_callback(error):
-    try:
-        auth_hdr = request.headers.get('Authorization')
-    except Exception:
-        auth_hdr = None
-    print('JWT unauthorized_loader called:', error, 'Authorization header:', auth_hdr)
-    return jsonify({'error': 'Missing authorization token'}), 401
-
-@jwt.expired_token_loader
-def expired_token_callback(jwt_header, jwt_data):
     try:
-        auth_hdr = request.headers.get('Authorization')
-    except Exception:
-        auth_hdr = None
-    print('JWT expired_token_loader called. jwt_header:', jwt_header, 'jwt_data:', jwt_data, 'Authorization header:', auth_hdr)
-    return jsonify({'error': 'Token has expired'}), 401
-
-# ============== TEST ROUTE ==============
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    if path != "" and os.path.exists(app.static_folder + '/' + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+        cursor.execute("SELECT pg_advisory_lock(%s)", (BOOTSTRAP_LOCK_ID,))
+        try:
+            init_db()
+            print("✓ Database tables created successfully!")
+
+            # Create default admin user if none exists
+            cursor.execute("SELECT id FROM users WHERE username = %s", ('admin',))
+            if not cursor.fetchone():
+                password_hash = generate_password_hash('admin123')
+                cursor.execute("""
+                    INSERT INTO users (username, email, full_name, role, password_hash)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (username) DO NOTHING
+                """, ('admin', 'admin@example.com', 'System Administrator', 'admin', password_hash))
+                print("✓ Default admin user created (username: admin, password: admin123)")
+
+            check_indexes(conn)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (BOOTSTRAP_LOCK_ID,))
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_app():
+    """
+    Builds the Flask app. No database work happens here: connections are
+    opened lazily by each worker on its first request, and the schema is
+    created by the ``init-db`` command (see bootstrap_database).
+    """
+    # The built frontend is served by frontend_bp, not Flask's static route
+    app = Flask(__name__, static_folder=None)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
+    json_provider.install(app)
+
+    CORS(app)
+    jwt = JWTManager(app)
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(colleges_bp, url_prefix='/api/colleges')
+    app.register_blueprint(programs_bp, url_prefix='/api/programs')
+    app.register_blueprint(students_bp, url_prefix='/api/students')
+    app.register_blueprint(statistics_bp, url_prefix='/api/statistics')
+    app.register_blueprint(system_bp, url_prefix='/api/system')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    app.register_blueprint(lookup_bp, url_prefix='/api/lookup')
+    app.register_blueprint(metrics_bp)
+    # Registered last: its catch-all route serves the frontend
+    app.register_blueprint(frontend_bp)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    if change_feed.ENABLED:
+        # Started on the first request of each worker (never in the preloading
+        # master), so caches hear about other workers' writes
+        app.before_request(change_feed.get_change_feed().start)
+
+    @app.after_request
+    def record_request_duration(response):
+        # Streamed bodies (exports) are timed up to the point their headers are ready
+        started = g.pop('request_started', None)
+        if started is not None:
+            metrics.REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                request.blueprint or '', request.endpoint or 'unmatched', request.method, response.status_code
+            )
+        return response
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Creates the schema and default admin user (safe to run concurrently)."""
+        bootstrap_database()
+
+    @app.cli.command('reconcile-counters')
+    @click.option('--every', type=int, default=0, help='Repeat every N seconds instead of running once.')
+    def reconcile_counters_command(every):
+        """Corrects drift in programs.student_count and colleges.program_count."""
+        while True:
+            corrected = reconcile_counters()
+            print(f"✓ Counters reconciled ({corrected} rows corrected)")
+            if not every:
+                break
+            time.sleep(every)
+
+    # Add JWT error handlers
+    @jwt.invalid_token_loader
+    def invalid_token_callback(error):
+        try:
+            auth_hdr = request.headers.get('Authorization')
+        except Exception:
+            auth_hdr = None
+        print('JWT invalid_token_loader called:', error, 'Authorization header:', auth_hdr)
+        return jsonify({'error': 'Invalid token'}), 401
+
+    @jwt.unauthorized_loader
+    def unauthorized_callback(error):
+        try:
+            auth_hdr = request.headers.get('Authorization')
+        except Exception:
+            auth_hdr = None
+        print('JWT unauthorized_loader called:', error, 'Authorization header:', auth_hdr)
+        return jsonify({'error': 'Missing authorization token'}), 401
+
+    @jwt.expired_token_loader
+    def expired_token_callback(jwt_header, jwt_data):
+        try:
+            auth_hdr = request.headers.get('Authorization')
+        except Exception:
+            auth_hdr = None
+        print('JWT expired_token_loader called. jwt_header:', jwt_header, 'jwt_data:', jwt_data, 'Authorization header:', auth_hdr)
+        return jsonify({'error': 'Token has expired'}), 401
+
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Development server: bootstrap in-process for convenience
+    bootstrap_database()
+    create_app().run(debug=True, port=5000)
@@ -0,0 +1,270 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+# Drives the real Flask app (in-process, through its test client) against
+# a local Postgres seeded at growing scales, and records latency
+# percentiles and throughput for the main API scenarios. Results are written
+# as JSON so runs from different commits can be compared with
+# benchmarks/compare.py.
+#
+# The data lives in a scratch schema (ssis_bench) of the configured
+# database, so the application's own tables are never touched. The query
+# result cache is disabled unless --with-cache is given, so the numbers
+# reflect the database work.
+#
+# Usage: python benchmarks/api_suite.py --scales 1000 10000 100000
+#        python benchmarks/api_suite.py --scales 1000000 --repeat 50 --concurrency 8
+#        python benchmarks/api_suite.py --only list search --output before.json
+
+SCHEMA = 'ssis_bench'
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ['PGOPTIONS'] = f'-c search_path={SCHEMA},public'
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import get_db_connection
+from services.pagination import encode_cursor
+from services import list_query
+from services.student_service import StudentService
+from seed import grow_students
+
+COLLEGES = 8
+PROGRAMS = 40
+
+# Shared by every client thread so generated student IDs never collide
+_sequence = itertools.count(1)
+
+def create_schema():
+    conn = get_db_connection()
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    conn.close()
+
+def student_id(n):
+    return f"{2000 + n // 10000:04d}-{n % 10000:04d}"
+
+def reset_data():
+    conn = get_db_connection()
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE students, programs, colleges CASCADE")
+        cursor.execute(
+            "INSERT INTO colleges (code, name) SELECT 'C' || g, 'College ' || g FROM generate_series(1, %s) g",
+            (COLLEGES,)
+        )
+        cursor.execute("""
+            INSERT INTO programs (code, name, college_code)
+            SELECT 'P' || g, 'Program ' || g, 'C' || (1 + g %% %s) FROM generate_series(1, %s) g
+        """, (COLLEGES, PROGRAMS))
+    conn.commit()
+    conn.close()
+
+class Scenarios:
+    """
+    The measured requests. Each scenario is a method taking a test client
+    and the iteration number, returning the response. Write scenarios work
+    on rows with IDs from 8000-0000 up, created by prepare() outside the
+    timed loop, so the seeded data and the read scenarios stay the same
+    across scales.
+    """
+    READS = ['list', 'search', 'sort_joined', 'deep_offset', 'deep_keyset']
+    WRITES = ['create', 'update_id_change', 'bulk_delete']
+    # Rows each write scenario consumes per request
+    CONSUMES = {'update_id_change': 1, 'bulk_delete': 10}
+
+    def __init__(self, headers, scale):
+        self.headers = headers
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._rows = []
+
+    @staticmethod
+    def _new_id(base):
+        n = next(_sequence)
+        return f"{base + n // 10000:04d}-{n % 10000:04d}"
+
+    def _take(self, count):
+        with self._lock:
+            taken, self._rows = self._rows[:count], self._rows[count:]
+        return taken
+
+    def prepare(self, name, repeat):
+        needed = self.CONSUMES.get(name, 0) * repeat
+        if not needed:
+            return
+        ids = [self._new_id(9000) for _ in range(needed)]
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO students (id, first_name, last_name, year_level, gender, program_code)
+                SELECT id, 'Bench', 'Student', 1, 'Other', 'P1' FROM unnest(%s::text[]) AS id
+            """, (ids,))
+        conn.commit()
+        conn.close()
+        self._rows = ids
+
+    def list(self, client, i):
+        return client.get('/api/students?page=1&per_page=10', headers=self.headers)
+
+    def search(self, client, i):
+        term = ('maria', 'santos', '2001-', 'qx')[i % 4]
+        return client.get(f'/api/students?search={term}&page=1&per_page=10', headers=self.headers)
+
+    def sort_joined(self, client, i):
+        return client.get('/api/students?sort_by=college_name&sort_order=desc&page=1&per_page=10', headers=self.headers)
+
+    def deep_offset(self, client, i):
+        page = max(1, self.scale // 10 - 10)
+        return client.get(f'/api/students?page={page}&per_page=10', headers=self.headers)
+
+    def deep_keyset(self, client, i):
+        after = student_id(max(0, self.scale - 100))
+        token = encode_cursor(list_query.build(StudentService.RESOURCE, keyset=True).order, [after])
+        return client.get(f'/api/students?cursor={token}&per_page=10&count=none', headers=self.headers)
+
+    def create(self, client, i):
+        return client.post('/api/students', headers=self.headers, json={
+            'id': self._new_id(9000), 'first_name': 'Bench', 'last_name': f'Student {i}',
+            'year_level': 1 + i % 4, 'gender': 'Other', 'program_code': f'P{1 + i % PROGRAMS}'
+        })
+
+    def update_id_change(self, client, i):
+        old_id, = self._take(1)
+        return client.put(f'/api/students/{old_id}', headers=self.headers, json={'id': self._new_id(8000)})
+
+    def bulk_delete(self, client, i):
+        return client.post('/api/students/bulk-delete', headers=self.headers, json={'ids': self._take(10)})
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, max(0, int(round(len(timings) * fraction)) - 1))]
+
+def run_scenario(app, headers, scale, name, repeat, concurrency):
+    timings, errors = [], []
+    lock = threading.Lock()
+    counter = iter(range(repeat))
+    scenarios = Scenarios(headers, scale)
+    scenario = getattr(scenarios, name)
+
+    def worker():
+        client = app.test_client()
+        local_timings, local_errors = [], []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            started = time.perf_counter()
+            response = scenario(client, i)
+            local_timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                local_errors.append(response.status_code)
+        with lock:
+            timings.extend(local_timings)
+            errors.extend(local_errors)
+
+    # Warm up connections and plans before measuring
+    if name in Scenarios.READS:
+        client = app.test_client()
+        for i in range(3):
+            scenario(client, i)
+    scenarios.prepare(name, repeat)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'requests': len(timings),
+        'errors': len(errors),
+        'throughput_rps': round(len(timings) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API latency and throughput benchmark")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=200, help='requests per scenario and scale')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads per scenario')
+    parser.add_argument('--only', nargs='+', choices=Scenarios.READS + Scenarios.WRITES)
+    parser.add_argument('--with-cache', action='store_true', help='keep the query result cache enabled')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>-<time>.json)')
+    args = parser.parse_args()
+
+    if not args.with_cache:
+        os.environ['QUERY_CACHE_BACKEND'] = 'none'
+
+    create_schema()
+    from app import bootstrap_database, create_app
+    bootstrap_database()
+    app = create_app()
+
+    client = app.test_client()
+    login = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    headers = {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+
+    names = args.only or (Scenarios.READS + Scenarios.WRITES)
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'concurrency': args.concurrency,
+        'with_cache': args.with_cache,
+        'results': {},
+    }
+
+    reset_data()
+    size = 0
+    print(f"{'students':>10} {'scenario':>18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for scale in sorted(args.scales):
+        grow_students(size, scale, PROGRAMS)
+        size = scale
+        report['results'][str(scale)] = {}
+        for name in names:
+            result = run_scenario(app, headers, scale, name, args.repeat, args.concurrency)
+            report['results'][str(scale)][name] = result
+            print(f"{scale:>10} {name:>18} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f} {result['errors']:>7}")
+        # Writes leave extra rows behind; drop them so the next scale starts clean
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM students WHERE id >= '8000'")
+        conn.commit()
+        conn.close()
+
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', f"{commit or 'unknown'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
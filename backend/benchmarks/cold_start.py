@@ -0,0 +1,47 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures worker cold start: the time a fresh interpreter takes to import
+# wsgi:app, and then to answer its first authenticated request (which also
+# opens the worker's first pooled connection). Each run is a new process.
+# Run `flask --app wsgi init-db` first.
+#
+# Usage: python benchmarks/cold_start.py --runs 10
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from wsgi import app
+imported = time.perf_counter()
+client = app.test_client()
+login = client.post('/api/auth/login', json={'username': %r, 'password': %r})
+headers = {'Authorization': 'Bearer ' + login.get_json()['access_token']}
+ready = time.perf_counter()
+client.get('/api/colleges?per_page=1', headers=headers)
+served = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (served - ready) * 1000}))
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker cold start time")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', PROBE % (args.username, args.password)], cwd=BACKEND_DIR
+        )
+        samples.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    for key in ('import_ms', 'first_request_ms'):
+        values = sorted(sample[key] for sample in samples)
+        print(f"{key:>18}: median {statistics.median(values):8.1f}  max {values[-1]:8.1f}")
@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+
+# Compares two result files written by benchmarks/api_suite.py and flags
+# scenarios whose latency grew by more than the threshold. Exits with
+# status 1 when any regression is found, so it can gate a CI job.
+#
+# Usage: python benchmarks/compare.py benchmarks/results/abc123-....json benchmarks/results/def456-....json
+#        python benchmarks/compare.py before.json after.json --metric p99_ms --threshold 20
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two API benchmark result files")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--metric', default='p95_ms', choices=['mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+    parser.add_argument('--threshold', type=float, default=10, help='percent slowdown counted as a regression')
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline {baseline.get('commit')}  candidate {candidate.get('commit')}  metric {args.metric}")
+    print(f"{'students':>10} {'scenario':>18} {'baseline':>10} {'candidate':>10} {'change':>8}")
+
+    regressions = 0
+    for scale, scenarios in candidate['results'].items():
+        for name, result in scenarios.items():
+            before = baseline['results'].get(scale, {}).get(name)
+            if before is None:
+                continue
+            old, new = before[args.metric], result[args.metric]
+            change = (new - old) / old * 100 if old else 0.0
+            flag = ''
+            if change > args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{scale:>10} {name:>18} {old:>10.2f} {new:>10.2f} {change:>+7.1f}%{flag}")
+
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:g}%")
+        sys.exit(1)
@@ -0,0 +1,65 @@
+import argparse
+import datetime
+import os
+import sys
+import time
+
+# Measures the CPU cost of encoding list responses: rows shaped like the
+# student list's (including a created_at datetime) are serialized with
+# Flask's standard-library provider and with json_provider.OrjsonProvider
+# in both datetime formats. No database is needed.
+#
+# Usage: python benchmarks/json_serialization.py --rows 1000 --repeat 200
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import json_provider
+
+def make_rows(count):
+    created = datetime.datetime(2025, 6, 1, 8, 30)
+    return [{
+        'id': f"{2020 + i // 10000:04d}-{i % 10000:04d}",
+        'first_name': 'Maria',
+        'last_name': f'Santos {i}',
+        'year_level': 1 + i % 4,
+        'gender': 'Female',
+        'program_code': 'BSCS',
+        'program_name': 'Bachelor of Science in Computer Science',
+        'college_code': 'CCS',
+        'college_name': 'College of Computer Studies',
+        'photo_url': f'https://example.com/photos/{i}.jpg',
+        'created_at': created + datetime.timedelta(minutes=i),
+    } for i in range(count)]
+
+def measure(dumps, document, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dumps(document)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON serialization cost per list response")
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if json_provider.orjson is None:
+        sys.exit('orjson is not installed')
+
+    app = Flask(__name__)
+    document = {'data': make_rows(args.rows), 'meta': {'page': 1, 'per_page': args.rows, 'total_items': args.rows}}
+    providers = [('stdlib (Flask default)', DefaultJSONProvider(app))]
+    for datetime_format in ('http', 'iso'):
+        os.environ['JSON_DATETIME_FORMAT'] = datetime_format
+        providers.append((f'orjson, {datetime_format} dates', json_provider.OrjsonProvider(app)))
+
+    baseline = None
+    print(f"{'provider':>24} {'ms per ' + str(args.rows) + ' rows':>18} {'speedup':>8}")
+    for name, provider in providers:
+        elapsed = measure(provider.dumps, document, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:>24} {elapsed:>18.3f} {baseline / elapsed:>7.1f}x")
@@ -0,0 +1,78 @@
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Measures /api/auth/login throughput and latency under concurrent clients,
+# while a second group of clients hits /api/auth/me. The point is to show
+# that a burst of logins (slow password hashing) does not drag down the
+# token-only routes served by the same workers.
+#
+# Run against a live server with an existing account:
+#
+# Usage: python benchmarks/login_throughput.py --username admin --password admin123
+#        python benchmarks/login_throughput.py --base-url http://localhost:5000 --clients 16
+
+def percentile(timings, fraction):
+    return timings[max(0, int(len(timings) * fraction) - 1)]
+
+def summarize(name, timings, statuses, elapsed):
+    timings.sort()
+    errors = sum(1 for status in statuses if status != 200)
+    print(f"{name:>8} {len(timings):>8} {len(timings) / elapsed:>10.1f} "
+          f"{statistics.median(timings):>9.2f} {percentile(timings, 0.95):>9.2f} "
+          f"{percentile(timings, 0.99):>9.2f} {errors:>7}")
+
+def timed(session, method, url, **kwargs):
+    started = time.perf_counter()
+    response = session.request(method, url, **kwargs)
+    return (time.perf_counter() - started) * 1000, response.status_code
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login and /me latency under concurrent load")
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent login clients')
+    parser.add_argument('--me-clients', type=int, default=8, help='concurrent /me clients')
+    parser.add_argument('--duration', type=float, default=15, help='seconds to run')
+    args = parser.parse_args()
+
+    login_url = f"{args.base_url}/api/auth/login"
+    me_url = f"{args.base_url}/api/auth/me"
+    credentials = {'username': args.username, 'password': args.password}
+
+    response = requests.post(login_url, json=credentials)
+    response.raise_for_status()
+    headers = {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    results = {'login': ([], []), 'me': ([], [])}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client(name, method, url, **kwargs):
+        timings, statuses = [], []
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                elapsed, status = timed(session, method, url, **kwargs)
+                timings.append(elapsed)
+                statuses.append(status)
+        with lock:
+            results[name][0].extend(timings)
+            results[name][1].extend(statuses)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients + args.me_clients) as executor:
+        for _ in range(args.clients):
+            executor.submit(client, 'login', 'POST', login_url, json=credentials)
+        for _ in range(args.me_clients):
+            executor.submit(client, 'me', 'GET', me_url, headers=headers)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'route':>8} {'requests':>8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, (timings, statuses) in results.items():
+        if timings:
+            summarize(name, timings, statuses, elapsed)
@@ -0,0 +1,78 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Measures student search latency as the students table grows, to show the
+# trigram indexes keep '%term%' searches flat instead of linear in size.
+#
+# The data lives in a scratch schema (ssis_bench) of the configured
+# database, so the application's own tables are never touched. The query
+# result cache is disabled, so repeats measure the database, not the cache.
+#
+# Usage: python benchmarks/search_latency.py --scales 1000 10000 100000
+#        python benchmarks/search_latency.py --without-indexes   (baseline)
+
+SCHEMA = 'ssis_bench'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['PGOPTIONS'] = f'-c search_path={SCHEMA},public'
+os.environ['QUERY_CACHE_BACKEND'] = 'none'
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import get_db_connection, init_db, TRIGRAM_INDEXES
+from services.student_service import StudentService
+from seed import grow_students
+
+TERMS = ['2031-01', 'maria', 'santos', 'qx']
+
+def prepare_schema(with_indexes):
+    conn = get_db_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+    init_db()
+    cursor.execute("TRUNCATE students, programs, colleges CASCADE")
+    cursor.execute("INSERT INTO colleges (code, name) SELECT 'C' || g, 'College ' || g FROM generate_series(1, 8) g")
+    cursor.execute("""
+        INSERT INTO programs (code, name, college_code)
+        SELECT 'P' || g, 'Program ' || g, 'C' || (1 + g % 8) FROM generate_series(1, 40) g
+    """)
+    if not with_indexes:
+        for table, column in TRIGRAM_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
+    cursor.close()
+    conn.close()
+
+def search(term):
+    """The measured request: the first page of a student search."""
+    return StudentService.get_all_students(term, 1, 10, 'id', 'asc')
+
+def measure(term, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        search(term)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student search latency by table size")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--without-indexes', action='store_true')
+    args = parser.parse_args()
+
+    prepare_schema(not args.without_indexes)
+    print(f"{'students':>10} {'term':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    size = 0
+    for scale in sorted(args.scales):
+        grow_students(size, scale)
+        size = scale
+        for term in TERMS:
+            p50, p95 = measure(term, args.repeat)
+            print(f"{scale:>10} {term:>10} {p50:>10.2f} {p95:>10.2f}")
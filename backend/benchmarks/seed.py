@@ -0,0 +1,27 @@
+# Seeding shared by the benchmark scripts. Import it after the script has
+# put the backend directory on sys.path and set its search_path.
+from db import get_db_connection
+
+def grow_students(start, stop, programs=40):
+    """
+    Inserts the generated students numbered ``start`` to ``stop - 1``,
+    spread over programs P1..P<programs>, then refreshes the planner's
+    statistics.
+    """
+    conn = get_db_connection()
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO students (id, first_name, last_name, year_level, gender, program_code)
+            SELECT to_char(2000 + g / 10000, 'FM0000') || '-' || to_char(g %% 10000, 'FM0000'),
+                   (ARRAY['Maria', 'Jose', 'Ana', 'Juan', 'Rosa', 'Mark', 'Grace', 'Paolo'])[1 + g %% 8]
+                       || ' ' || initcap(substr(md5(g::text), 1, 5)),
+                   (ARRAY['Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza'])[1 + g %% 6]
+                       || initcap(substr(md5((g * 7)::text), 1, 4)),
+                   1 + g %% 4,
+                   (ARRAY['Male', 'Female', 'Other'])[1 + g %% 3],
+                   'P' || (1 + g %% %s)
+            FROM generate_series(%s, %s) g
+        """, (programs, start, stop - 1))
+        cursor.execute("ANALYZE students")
+    conn.commit()
+    conn.close()
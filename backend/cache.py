@@ -0,0 +1,132 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+MISSING = object()
+
+class TTLCache:
+    """A small thread-safe cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class LRUCache:
+    """
+    A thread-safe cache holding at most ``maxsize`` entries, each expiring
+    ``ttl`` seconds after being set. The least recently used entry is
+    evicted to make room. Counts hits, misses, evictions and expirations.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), max_size=self.maxsize)
+
+class RedisCache:
+    """
+    The LRUCache interface over a Redis server, so worker processes share
+    entries. Values are pickled; expiry and eviction are left to Redis
+    (configure ``maxmemory-policy allkeys-lru``). Hit and miss counts are
+    per process.
+    """
+
+    def __init__(self, url, ttl, prefix='ssis:'):
+        if redis is None:
+            raise RuntimeError('The redis package is required for the Redis cache backend')
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key, default=MISSING):
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            self._count('misses')
+            return default
+        self._count('hits')
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(self.ttl)))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def generations(self, names):
+        """Returns the current generation number of each of ``names``."""
+        values = self._client.mget([f"{self.prefix}gen:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, name):
+        self._client.incr(f"{self.prefix}gen:{name}")
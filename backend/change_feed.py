@@ -0,0 +1,169 @@
+"""
+Fans out the NOTIFY messages sent by the change-feed triggers (see
+db.change_notify_sql) to the clients of GET /api/events.
+
+Each worker process runs one listener thread on its own autocommit
+connection, outside the pool, which LISTENs on db.CHANGE_CHANNEL. Every
+message is parsed once and put on the queue of each subscriber. A
+subscriber that falls CHANGE_FEED_QUEUE events behind has its queue
+cleared and gets a single "resync" event instead, as does everyone after
+the listener reconnects, since messages sent while it was away are lost.
+
+The listener also sends data_changed for each message, so caches in this
+process are invalidated by writes made in any worker or by other clients
+of the database. Set CHANGE_FEED=off to disable the listener.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from db import CHANGE_CHANNEL, get_db_connection
+from signals import data_changed
+
+ENABLED = os.getenv('CHANGE_FEED', 'on') != 'off'
+QUEUE_SIZE = int(os.getenv('CHANGE_FEED_QUEUE', 256))
+# Seconds between liveness checks of an idle listener connection
+POLL_INTERVAL = 15
+RECONNECT_MAX_DELAY = 30
+
+log = logging.getLogger('ssis.change_feed')
+
+class Subscription:
+    def __init__(self, maxsize):
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Too far behind to catch up event by event; tell the client to reload
+            self.clear()
+            self._queue.put_nowait(event if event['event'] == 'resync' else _resync_event(event['id']))
+
+    def clear(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def get(self, timeout):
+        """Returns the next event, or None if none arrives within ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+def _resync_event(event_id):
+    return {'id': event_id, 'event': 'resync', 'data': {}}
+
+class ChangeFeed:
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self._thread = None
+        self._pid = None
+        self._connected = False
+        self._delivered = 0
+        self._reconnects = 0
+
+    def start(self):
+        """Starts this process's listener thread unless it is already running."""
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._subscribers = set()
+                self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def subscribe(self, limit=None):
+        """Returns a new Subscription, or None if ``limit`` subscribers are already open."""
+        self.start()
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'connected': self._connected,
+                'delivered': self._delivered,
+                'reconnects': self._reconnects,
+            }
+
+    def _publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._delivered += 1
+        for subscription in subscribers:
+            subscription.put(event)
+
+    def _run(self):
+        delay = 1
+        first = True
+        while True:
+            conn = None
+            try:
+                conn = get_db_connection()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANGE_CHANNEL}")
+                with self._lock:
+                    self._connected = True
+                    if not first:
+                        self._reconnects += 1
+                if not first:
+                    self._publish(_resync_event(next(self._ids)))
+                first, delay = False, 1
+                self._listen(conn)
+            except Exception:
+                log.exception('Change feed listener failed, reconnecting in %ss', delay)
+            finally:
+                with self._lock:
+                    self._connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def _listen(self, conn):
+        while True:
+            if select.select([conn], [], [], POLL_INTERVAL) == ([], [], []):
+                # Nothing for a while; make sure the connection is still there
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    change = json.loads(notify.payload)
+                except ValueError:
+                    log.warning('Ignoring malformed change notification: %r', notify.payload)
+                    continue
+                data_changed.send(change['table'])
+                self._publish({'id': next(self._ids), 'event': 'change', 'data': change})
+
+_feed = ChangeFeed()
+
+def get_change_feed():
+    return _feed
@@ -0,0 +1,35 @@
+# Gunicorn settings for serving wsgi:app. Every value can be overridden
+# from the environment, e.g. WEB_CONCURRENCY=8 gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads let one worker overlap requests that are waiting on Postgres;
+# keep DB_POOL_MAX at or above this so they do not queue for connections.
+# Every open /api/events stream also holds a thread, so each worker
+# accepts at most WEB_THREADS - CHANGE_FEED_RESERVED_THREADS streams:
+# 2 with the defaults (4 - 2), for 2 x WEB_CONCURRENCY in total. Further
+# clients get 503; raise WEB_THREADS to serve more.
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 4))
+timeout = int(os.getenv('WEB_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 5000))
+max_requests_jitter = 500
+
+# Import the app once in the master and fork the workers from it, so
+# workers start in milliseconds and share the imported code's memory.
+# Nothing in create_app() touches the database; each worker opens its own
+# pool connections on first use (db.ConnectionPool also detects forks).
+preload_app = True
+
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+
+def when_ready(server):
+    # The schema is created by `flask --app wsgi init-db`, not by the server.
+    # Refuse to serve if it has not been run.
+    from db import check_indexes
+    check_indexes()
@@ -0,0 +1,79 @@
+"""
+A Flask JSON provider backed by orjson.
+
+orjson encodes the dicts of rows the services return several times faster
+than the standard library, and serializes dict subclasses such as
+psycopg2's RealDictRow directly.
+
+JSON_DATETIME_FORMAT selects how datetimes are written:
+- 'http' (default) keeps Flask's own format, e.g.
+  "Wed, 21 Oct 2015 07:28:00 GMT", so responses are unchanged.
+- 'iso' uses orjson's native RFC 3339 encoding, e.g.
+  "2015-10-21T07:28:00", which skips the Python callback per value.
+"""
+import dataclasses
+import datetime
+import decimal
+import os
+import uuid
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default_http(value):
+    if isinstance(value, datetime.date):
+        return http_date(value)
+    return _default(value)
+
+def _default(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    # Same defaults as Flask's DefaultJSONProvider
+    sort_keys = True
+    mimetype = 'application/json'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.datetime_format = os.getenv('JSON_DATETIME_FORMAT', 'http')
+        if self.datetime_format not in ('http', 'iso'):
+            raise ValueError("JSON_DATETIME_FORMAT must be 'http' or 'iso'")
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.datetime_format == 'http':
+            options |= orjson.OPT_PASSTHROUGH_DATETIME
+        return options
+
+    def dumps_bytes(self, obj):
+        default = _default_http if self.datetime_format == 'http' else _default
+        return orjson.dumps(obj, default=default, option=self._options())
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+def install(app):
+    """Switches ``app`` to OrjsonProvider when orjson is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
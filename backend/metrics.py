@@ -0,0 +1,183 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Request timings are recorded by the hooks registered in app.py, SQL
+timings by the instrumented cursors db.get_db_connection hands out, and
+pool waits by ConnectionPool.getconn. GET /metrics renders everything.
+
+Statements slower than SLOW_QUERY_MS milliseconds are also logged to the
+'ssis.sql' logger at WARNING level.
+
+Every figure lives in the memory of the process that recorded it. Under
+gunicorn with several workers (WEB_CONCURRENCY > 1), a scrape of
+/metrics is answered by whichever worker accepts it, so it shows that
+worker's figures only, and successive scrapes may come from different
+workers. Each scrape carries ssis_process_start_time_seconds with the
+worker's pid as a label, so they can be told apart. Run a single worker
+(raising WEB_THREADS instead) when whole-server figures are needed.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+PROCESS_START_TIME = time.time()
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+
+# Seconds; a typical request or query should land in the lower half
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+slow_query_log = logging.getLogger('ssis.sql')
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets + (float('inf'),), series[:-2] + [series[-1]]):
+                    labels = _format_labels(self.labels, label_values, ('le', _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+def render_samples(name, help, kind, samples):
+    """
+    Renders ``samples`` ({((label, value), ...): sample}) as a metric family
+    of type ``kind``, for values owned elsewhere and read at scrape time.
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        labels = dict(labels)
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    return lines
+
+REQUEST_DURATION = Histogram(
+    'ssis_http_request_duration_seconds', 'Time spent handling HTTP requests.',
+    labels=('blueprint', 'endpoint', 'method', 'status')
+)
+QUERY_DURATION = Histogram(
+    'ssis_db_query_duration_seconds', 'Time spent executing SQL statements.',
+    labels=('operation', 'fingerprint')
+)
+QUERY_ROWS = Histogram(
+    'ssis_db_query_rows', 'Rows returned or affected by SQL statements.',
+    labels=('operation', 'fingerprint'), buckets=ROW_BUCKETS
+)
+QUERY_ERRORS = Counter(
+    'ssis_db_query_errors_total', 'SQL statements that raised an error.',
+    labels=('operation', 'fingerprint')
+)
+SLOW_QUERIES = Counter(
+    'ssis_db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS.',
+    labels=('operation', 'fingerprint')
+)
+POOL_WAIT = Histogram(
+    'ssis_db_pool_wait_seconds', 'Time spent waiting to check out a pooled connection.'
+)
+
+REGISTRY = [REQUEST_DURATION, QUERY_DURATION, QUERY_ROWS, QUERY_ERRORS, SLOW_QUERIES, POOL_WAIT]
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_fingerprints = {}
+
+def fingerprint(statement):
+    """
+    Returns (operation, fingerprint) for a SQL statement. Literals and
+    placeholders are normalized away so the same query shape always maps
+    to the same short hash, whatever its parameters.
+    """
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    normalized = _LITERALS.sub('?', statement.replace('%s', '?'))
+    normalized = _PLACEHOLDER_LISTS.sub('(?)', ' '.join(normalized.split()))
+    normalized = _REPEATED_LISTS.sub('(?)', normalized)
+    operation = normalized.split(' ', 1)[0].upper() if normalized else ''
+    result = operation, hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    # Statements with inlined values (execute_values batches) are not worth keeping
+    if len(statement) <= 4096 and len(_fingerprints) < 10000:
+        _fingerprints[statement] = result
+    return result
+
+def observe_query(statement, seconds, rows, failed=False):
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf-8', 'replace')
+    elif not isinstance(statement, str):
+        statement = str(statement)
+    operation, digest = fingerprint(statement)
+    QUERY_DURATION.observe(seconds, operation, digest)
+    if failed:
+        QUERY_ERRORS.inc(operation, digest)
+    elif rows is not None and rows >= 0:
+        QUERY_ROWS.observe(rows, operation, digest)
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(operation, digest)
+        slow_query_log.warning('Slow query (%.1f ms, fingerprint %s): %s', seconds * 1000, digest, ' '.join(statement.split()))
+
+def render(extra=()):
+    """Renders the registry, plus ``extra`` pre-rendered lines, as exposition text."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return '\n'.join(lines) + '\n'
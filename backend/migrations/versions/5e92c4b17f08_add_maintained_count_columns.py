@@ -0,0 +1,110 @@
+"""Add trigger-maintained student_count and program_count columns
+
+Revision ID: 5e92c4b17f08
+Revises: d41b7e9c0a63
+Create Date: 2026-10-18 11:26:15.337410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e92c4b17f08'
+down_revision = 'd41b7e9c0a63'
+branch_labels = None
+depends_on = None
+
+
+COUNTERS = [
+    ('students', 'program_code', 'programs', 'code', 'student_count'),
+    ('programs', 'college_code', 'colleges', 'code', 'program_count'),
+]
+
+
+def _create_triggers(child, fk, parent, key, counter):
+    function = f"{child}_{counter}_trigger"
+    delta = f"""
+        UPDATE {parent} t SET {counter} = t.{counter} + d.delta
+        FROM (
+            SELECT {fk}, SUM(delta) AS delta FROM (%s) changes
+            WHERE {fk} IS NOT NULL GROUP BY {fk} HAVING SUM(delta) <> 0
+        ) d
+        WHERE t.{key} = d.{fk};
+    """
+    added = f"SELECT {fk}, 1 AS delta FROM new_rows"
+    removed = f"SELECT {fk}, -1 AS delta FROM old_rows"
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {delta % added}
+        ELSIF TG_OP = 'DELETE' THEN
+            {delta % removed}
+        ELSE
+            {delta % (added + ' UNION ALL ' + removed)}
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                              ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                              ('DELETE', 'OLD TABLE AS old_rows')):
+        trigger = f"{child}_{counter}_{event.lower()}"
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {child}")
+        op.execute(f"""
+        CREATE TRIGGER {trigger} AFTER {event} ON {child}
+        REFERENCING {transition}
+        FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+        """)
+
+    reset = f"{parent}_{counter}_reset"
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {reset}() RETURNS trigger AS $$
+    BEGIN
+        NEW.{counter} := 0;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS {reset} ON {parent}")
+    op.execute(f"""
+    CREATE TRIGGER {reset} BEFORE UPDATE OF {key} ON {parent}
+    FOR EACH ROW WHEN (OLD.{key} IS DISTINCT FROM NEW.{key})
+    EXECUTE FUNCTION {reset}()
+    """)
+
+
+def upgrade():
+    # IF NOT EXISTS: init_db adds these columns too
+    for _, _, parent, _, counter in COUNTERS:
+        op.execute(f"ALTER TABLE {parent} ADD COLUMN IF NOT EXISTS {counter} INTEGER NOT NULL DEFAULT 0")
+
+    op.execute("LOCK TABLE students, programs IN SHARE MODE")
+    for child, fk, parent, key, counter in COUNTERS:
+        _create_triggers(child, fk, parent, key, counter)
+        # Backfill from the current rows
+        op.execute(f"""
+            UPDATE {parent} t SET {counter} = actual.n
+            FROM (
+                SELECT p.{key}, COUNT(c.{fk}) AS n
+                FROM {parent} p LEFT JOIN {child} c ON c.{fk} = p.{key}
+                GROUP BY p.{key}
+            ) actual
+            WHERE t.{key} = actual.{key}
+        """)
+
+
+def downgrade():
+    for child, fk, parent, key, counter in COUNTERS:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS {child}_{counter}_{event} ON {child}")
+        op.execute(f"DROP TRIGGER IF EXISTS {parent}_{counter}_reset ON {parent}")
+        op.execute(f"DROP FUNCTION IF EXISTS {child}_{counter}_trigger()")
+        op.execute(f"DROP FUNCTION IF EXISTS {parent}_{counter}_reset()")
+
+    with op.batch_alter_table('colleges', schema=None) as batch_op:
+        batch_op.drop_column('program_count')
+    with op.batch_alter_table('programs', schema=None) as batch_op:
+        batch_op.drop_column('student_count')
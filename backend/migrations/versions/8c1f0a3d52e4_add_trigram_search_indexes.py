@@ -0,0 +1,40 @@
+"""Add trigram search indexes
+
+Revision ID: 8c1f0a3d52e4
+Revises: 39e73cf7bb75
+Create Date: 2026-10-18 09:12:04.518220
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f0a3d52e4'
+down_revision = '39e73cf7bb75'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = [
+    ('students', 'id'),
+    ('students', 'first_name'),
+    ('students', 'last_name'),
+    ('programs', 'code'),
+    ('programs', 'name'),
+    ('colleges', 'code'),
+    ('colleges', 'name'),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in TRIGRAM_INDEXES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    for table, column in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
@@ -0,0 +1,52 @@
+"""Add table_versions change counters for conditional GETs
+
+Revision ID: a7d3c5e21f94
+Revises: 5e92c4b17f08
+Create Date: 2026-10-18 14:02:41.518203
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3c5e21f94'
+down_revision = '5e92c4b17f08'
+branch_labels = None
+depends_on = None
+
+
+VERSIONED_TABLES = ['students', 'programs', 'colleges']
+
+
+def upgrade():
+    # IF NOT EXISTS / DROP IF EXISTS: init_db may already have created these
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name VARCHAR(63) PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0,
+        changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1, changed_at = now()
+        WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for table in VERSIONED_TABLES:
+        op.execute(f"INSERT INTO table_versions (table_name) VALUES ('{table}') ON CONFLICT DO NOTHING")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_version_bump ON {table}")
+        op.execute(f"""
+        CREATE TRIGGER {table}_version_bump AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """)
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_version_bump ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
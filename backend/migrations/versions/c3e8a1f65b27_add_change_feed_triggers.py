@@ -0,0 +1,77 @@
+"""Add NOTIFY triggers for the /api/events change feed
+
+Revision ID: c3e8a1f65b27
+Revises: a7d3c5e21f94
+Create Date: 2026-10-18 16:40:12.904117
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a1f65b27'
+down_revision = 'a7d3c5e21f94'
+branch_labels = None
+depends_on = None
+
+
+CHANGE_CHANNEL = 'ssis_changes'
+CHANGE_FEED_KEYS = {'students': 'id', 'programs': 'code', 'colleges': 'code'}
+EVENTS = [
+    ('INSERT', 'REFERENCING NEW TABLE AS new_rows'),
+    ('UPDATE', 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('DELETE', 'REFERENCING OLD TABLE AS old_rows'),
+    ('TRUNCATE', ''),
+]
+
+
+def _create_triggers(table, key):
+    function = f"{table}_notify_change"
+    payload = f"""SELECT json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', json_agg(DISTINCT {key}))::text
+            FROM (%s) changed HAVING COUNT(*) > 0 INTO message"""
+    reload = "json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', NULL)::text"
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+    DECLARE
+        message text;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {payload % f"SELECT {key} FROM new_rows"};
+        ELSIF TG_OP = 'DELETE' THEN
+            {payload % f"SELECT {key} FROM old_rows"};
+        ELSIF TG_OP = 'UPDATE' THEN
+            {payload % f"SELECT {key} FROM new_rows UNION ALL SELECT {key} FROM old_rows"};
+        ELSE
+            message := {reload};
+        END IF;
+        IF message IS NULL THEN
+            RETURN NULL;
+        END IF;
+        IF octet_length(message) > 7900 THEN
+            message := {reload};
+        END IF;
+        PERFORM pg_notify('{CHANGE_CHANNEL}', message);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for event, transition in EVENTS:
+        # init_db may already have installed this trigger
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event.lower()} ON {table}")
+        op.execute(f"""
+        CREATE TRIGGER {table}_notify_{event.lower()} AFTER {event} ON {table}
+        {transition}
+        FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+        """)
+
+
+def upgrade():
+    for table, key in CHANGE_FEED_KEYS.items():
+        _create_triggers(table, key)
+
+
+def downgrade():
+    for table in CHANGE_FEED_KEYS:
+        for event, _ in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event.lower()} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_notify_change()")
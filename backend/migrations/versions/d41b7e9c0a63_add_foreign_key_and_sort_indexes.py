@@ -0,0 +1,39 @@
+"""Add foreign key and sort indexes
+
+Revision ID: d41b7e9c0a63
+Revises: 8c1f0a3d52e4
+Create Date: 2026-10-18 10:03:47.902115
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41b7e9c0a63'
+down_revision = '8c1f0a3d52e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # students.program_code: FK joins, ON UPDATE/DELETE cascades from programs,
+    # the program_code filter and sort, with the primary key as tie-breaker
+    op.create_index('ix_students_program_code_id', 'students', ['program_code', 'id'], if_not_exists=True)
+    op.create_index('ix_students_last_name_id', 'students', ['last_name', 'id'], if_not_exists=True)
+    op.create_index('ix_students_first_name_id', 'students', ['first_name', 'id'], if_not_exists=True)
+    op.create_index('ix_students_year_level_id', 'students', ['year_level', 'id'], if_not_exists=True)
+    op.create_index('ix_students_gender_id', 'students', ['gender', 'id'], if_not_exists=True)
+
+    # programs.college_code: FK joins and cascades from colleges
+    op.create_index('ix_programs_college_code_code', 'programs', ['college_code', 'code'], if_not_exists=True)
+    op.create_index('ix_programs_name_code', 'programs', ['name', 'code'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_programs_name_code', table_name='programs', if_exists=True)
+    op.drop_index('ix_programs_college_code_code', table_name='programs', if_exists=True)
+    op.drop_index('ix_students_gender_id', table_name='students', if_exists=True)
+    op.drop_index('ix_students_year_level_id', table_name='students', if_exists=True)
+    op.drop_index('ix_students_first_name_id', table_name='students', if_exists=True)
+    op.drop_index('ix_students_last_name_id', table_name='students', if_exists=True)
+    op.drop_index('ix_students_program_code_id', table_name='students', if_exists=True)
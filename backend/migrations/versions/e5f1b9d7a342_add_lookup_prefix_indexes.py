@@ -0,0 +1,33 @@
+"""Add text_pattern_ops prefix indexes for the lookup endpoint
+
+Revision ID: e5f1b9d7a342
+Revises: c3e8a1f65b27
+Create Date: 2026-10-18 18:21:05.611840
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f1b9d7a342'
+down_revision = 'c3e8a1f65b27'
+branch_labels = None
+depends_on = None
+
+
+PREFIX_INDEXES = [
+    ('ix_students_id_prefix', 'students', 'id text_pattern_ops'),
+    ('ix_students_last_name_prefix', 'students', 'lower(last_name) text_pattern_ops'),
+    ('ix_students_first_name_prefix', 'students', 'lower(first_name) text_pattern_ops'),
+]
+
+
+def upgrade():
+    # Prefix LIKE and byte-order ORDER BY for /api/lookup, whatever the collation
+    for name, table, columns in PREFIX_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    for name, _, _ in reversed(PREFIX_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,72 @@
+"""Skip change feed notifications for counter-only updates
+
+Revision ID: f2a6d8c41b59
+Revises: e5f1b9d7a342
+Create Date: 2026-10-19 10:12:37.204551
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6d8c41b59'
+down_revision = 'e5f1b9d7a342'
+branch_labels = None
+depends_on = None
+
+
+CHANGE_CHANNEL = 'ssis_changes'
+# (table, key, counter column maintained by the student/program triggers)
+COUNTED_TABLES = [
+    ('programs', 'code', 'student_count'),
+    ('colleges', 'code', 'program_count'),
+]
+
+
+def _replace_function(table, key, updated):
+    payload = f"""SELECT json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', json_agg(DISTINCT {key}))::text
+            FROM (%s) changed HAVING COUNT(*) > 0 INTO message"""
+    reload = "json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', NULL)::text"
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {table}_notify_change() RETURNS trigger AS $$
+    DECLARE
+        message text;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {payload % f"SELECT {key} FROM new_rows"};
+        ELSIF TG_OP = 'DELETE' THEN
+            {payload % f"SELECT {key} FROM old_rows"};
+        ELSIF TG_OP = 'UPDATE' THEN
+            {payload % updated};
+        ELSE
+            message := {reload};
+        END IF;
+        IF message IS NULL THEN
+            RETURN NULL;
+        END IF;
+        IF octet_length(message) > 7900 THEN
+            message := {reload};
+        END IF;
+        PERFORM pg_notify('{CHANGE_CHANNEL}', message);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+
+
+def upgrade():
+    # Report only the rows that differ outside the counter column
+    for table, key, counter in COUNTED_TABLES:
+        strip = f" - '{counter}'"
+        _replace_function(table, key, (
+            f"SELECT r->>'{key}' AS {key} FROM ("
+            f"(SELECT to_jsonb(n){strip} AS r FROM new_rows n EXCEPT ALL SELECT to_jsonb(o){strip} FROM old_rows o) "
+            f"UNION ALL "
+            f"(SELECT to_jsonb(o){strip} FROM old_rows o EXCEPT ALL SELECT to_jsonb(n){strip} FROM new_rows n)"
+            f") differing"
+        ))
+
+
+def downgrade():
+    for table, key, _ in COUNTED_TABLES:
+        _replace_function(table, key, f"SELECT {key} FROM new_rows UNION ALL SELECT {key} FROM old_rows")
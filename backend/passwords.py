@@ -0,0 +1,50 @@
+"""
+Password hashing on a small, bounded worker pool.
+
+Werkzeug's hashes (scrypt/pbkdf2) are deliberately slow. Running them on
+a fixed number of threads caps how much CPU a burst of logins can take,
+so the rest of the worker's requests keep flowing. Callers that cannot get
+a slot within AUTH_HASH_WAIT seconds get HashingBusy instead of queueing
+without bound.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+WORKERS = int(os.getenv('AUTH_HASH_WORKERS', 2))
+QUEUE = int(os.getenv('AUTH_HASH_QUEUE', 16))
+WAIT = float(os.getenv('AUTH_HASH_WAIT', 5))
+
+class HashingBusy(Exception):
+    """Raised when every hashing slot stays taken for longer than AUTH_HASH_WAIT."""
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+_pid = None
+
+def _pool():
+    # Threads do not survive fork, so each worker process builds its own pool
+    global _executor, _slots, _pid
+    with _lock:
+        if _pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='password-hash')
+            _slots = threading.BoundedSemaphore(WORKERS + QUEUE)
+            _pid = os.getpid()
+        return _executor, _slots
+
+def _run(fn, *args):
+    executor, slots = _pool()
+    if not slots.acquire(timeout=WAIT):
+        raise HashingBusy('Too many concurrent password checks, please retry')
+    try:
+        return executor.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+def hash_password(password):
+    return _run(generate_password_hash, password)
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
@@ -0,0 +1,53 @@
+import functools
+import hashlib
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+from db import get_table_versions
+from services.query_cache import request_versions
+
+def version_validators(versions, tables):
+    """
+    Returns the (etag, last_modified) pair for a response built from
+    ``tables``, given their {table: (version, changed_at)} versions.
+    """
+    tag = ';'.join(
+        f"{table}:{versions[table][0]}:{versions[table][1].isoformat()}"
+        for table in tables if table in versions
+    )
+    etag = hashlib.sha1(tag.encode()).hexdigest()[:20]
+    last_modified = max((changed_at for _, changed_at in versions.values()), default=None)
+    return etag, last_modified
+
+def conditional_get(*tables):
+    """
+    Makes a GET view answer conditional requests from the versions of the
+    ``tables`` its response is built from.
+
+    The ETag and Last-Modified headers come from table_versions, so a client
+    whose copy is current gets 304 Not Modified without the view (and its
+    list query) running at all. Responses are marked ``no-cache`` so browsers
+    revalidate every time instead of reusing a stale copy. The view's cached
+    queries are keyed on the same versions (see services.query_cache), so
+    the body always matches its ETag.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_table_versions(tables)
+            etag, last_modified = version_validators(versions, tables)
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                with request_versions(versions):
+                    response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+import change_feed
+import os
+
+events_bp = Blueprint('events', __name__)
+
+# Under gunicorn's gthread workers each open stream holds one of the
+# worker's WEB_THREADS threads for as long as the client stays. The cap
+# keeps CHANGE_FEED_RESERVED_THREADS of them free for ordinary requests;
+# raise WEB_THREADS to allow more streams per worker.
+WORKER_THREADS = int(os.getenv('WEB_THREADS', 4))
+RESERVED_THREADS = int(os.getenv('CHANGE_FEED_RESERVED_THREADS', 2))
+MAX_CLIENTS = max(0, WORKER_THREADS - RESERVED_THREADS)
+HEARTBEAT_INTERVAL = 15
+# Milliseconds a disconnected EventSource waits before reconnecting
+RETRY_MS = 3000
+# Seconds a stream ticket stays valid. Tickets go in the URL, where access
+# logs record them, so they only open a stream and expire quickly.
+TICKET_TTL = int(os.getenv('CHANGE_FEED_TICKET_TTL', 30))
+
+def _tickets():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='events-ticket')
+
+@events_bp.route('/ticket', methods=['POST'])
+@jwt_required()
+def issue_ticket():
+    """Issues a short-lived ticket for opening one event stream with ?ticket=."""
+    return jsonify({'ticket': _tickets().dumps({'sub': get_jwt_identity()}), 'expires_in': TICKET_TTL})
+
+def _format(event, dumps):
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {dumps(event['data'])}\n\n"
+
+def _stream(subscription, resume):
+    dumps = current_app.json.dumps
+    yield f"retry: {RETRY_MS}\n\n"
+    if resume:
+        # Event ids are per worker and nothing is replayed, so a client
+        # coming back cannot know what it missed
+        yield _format({'id': 0, 'event': 'resync', 'data': {}}, dumps)
+    while True:
+        event = subscription.get(HEARTBEAT_INTERVAL)
+        if event is None:
+            # Comment line: keeps proxies from closing an idle stream
+            yield ": keepalive\n\n"
+        else:
+            yield _format(event, dumps)
+
+@events_bp.route('', methods=['GET'])
+def stream_events():
+    """
+    Streams table changes as Server-Sent Events. Each "change" event's data
+    is {"table", "op", "keys"}; "keys" is null when the change was too large
+    to list, and a "resync" event means events were lost. In both cases the
+    client should reload the affected views instead of patching them.
+
+    EventSource cannot set headers, so instead of the access token it may
+    pass ?ticket=<ticket> from POST /api/events/ticket. A ticket expires
+    after TICKET_TTL seconds, so fetch a new one before reconnecting after
+    an error. Each worker serves at most MAX_CLIENTS streams (its threads
+    less the reserved ones) and answers 503 beyond that.
+    """
+    ticket = request.args.get('ticket')
+    if ticket is None:
+        verify_jwt_in_request(locations=['headers'])
+    else:
+        try:
+            _tickets().loads(ticket, max_age=TICKET_TTL)
+        except BadSignature:
+            return jsonify({'error': 'Invalid or expired stream ticket'}), 401
+    if not change_feed.ENABLED:
+        return jsonify({'error': 'Change feed is disabled'}), 503
+    feed = change_feed.get_change_feed()
+    subscription = feed.subscribe(limit=MAX_CLIENTS)
+    if subscription is None:
+        response = jsonify({'error': 'Too many open event streams, please retry'})
+        response.headers['Retry-After'] = str(RETRY_MS // 1000)
+        return response, 503
+
+    resume = 'Last-Event-ID' in request.headers
+    response = Response(stream_with_context(_stream(subscription, resume)), mimetype='text/event-stream')
+    # Runs when the client goes away, even if the body was never started
+    response.call_on_close(lambda: feed.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,130 @@
+"""
+Serves the built frontend (dist/) from an in-memory manifest.
+
+The manifest is built once at startup: every file is read, hashed for its
+ETag and, when compressible, precompressed with gzip (and brotli if the
+package is installed). Requests are answered from memory with no
+filesystem calls. Precompressed ``.gz``/``.br`` files already next to an
+asset (e.g. from the frontend build) are used instead of compressing
+again.
+
+Vite puts content-hashed files under assets/, which are cached as
+immutable. Everything else, index.html in particular, must be revalidated.
+Unknown paths without a file extension fall back to index.html for the
+client-side router. Unknown /api/ paths and missing files get a 404.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from flask import Blueprint, Response, current_app, jsonify, request, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+frontend_bp = Blueprint('frontend', __name__)
+
+# Files larger than this are streamed from disk instead of held in memory
+MAX_IN_MEMORY = 8 * 1024 * 1024
+# Below this size compression does not pay for its headers
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+HASHED_ASSET = re.compile(r'^assets/.+[-.][A-Za-z0-9_-]{8,}\.\w+$')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+class StaticFile:
+    def __init__(self, path, relative, stat, data):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(relative)[0] or 'application/octet-stream'
+        self.last_modified = int(stat.st_mtime)
+        self.cache_control = IMMUTABLE if HASHED_ASSET.match(relative) else REVALIDATE
+        self.etag = hashlib.sha1(data).hexdigest()[:20] if data is not None else f"{int(stat.st_mtime)}-{stat.st_size}"
+        # Content-Encoding -> body; None means "stream from disk"
+        self.variants = {'identity': data}
+
+    def compressible(self):
+        data = self.variants['identity']
+        return data is not None and len(data) >= MIN_COMPRESS_SIZE and self.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+    def add_variant(self, encoding, body):
+        # Keep a variant only if it actually saves bytes
+        if len(body) < len(self.variants['identity']):
+            self.variants[encoding] = body
+
+def build_manifest(root):
+    """Returns {relative path: StaticFile} for every file under ``root``."""
+    manifest = {}
+    if not os.path.isdir(root):
+        return manifest
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if relative.endswith(('.gz', '.br')) and os.path.exists(path[:-3]):
+                continue
+            stat = os.stat(path)
+            data = None
+            if stat.st_size <= MAX_IN_MEMORY:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            entry = StaticFile(path, relative, stat, data)
+            if entry.compressible():
+                for encoding, suffix, compress in (('gzip', '.gz', lambda d: gzip.compress(d, 9, mtime=0)),
+                                                   ('br', '.br', brotli.compress if brotli else None)):
+                    if os.path.exists(path + suffix):
+                        with open(path + suffix, 'rb') as f:
+                            entry.add_variant(encoding, f.read())
+                    elif compress is not None:
+                        entry.add_variant(encoding, compress(data))
+            manifest[relative] = entry
+    return manifest
+
+@frontend_bp.record_once
+def _load_manifest(state):
+    app = state.app
+    root = app.config.get('FRONTEND_DIST', os.path.join(app.root_path, 'dist'))
+    app.extensions['frontend_manifest'] = build_manifest(root)
+
+def _pick_encoding(entry):
+    best, best_quality = 'identity', 0
+    for encoding in ('br', 'gzip'):
+        quality = request.accept_encodings[encoding]
+        if encoding in entry.variants and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _file_response(entry):
+    encoding = _pick_encoding(entry)
+    body = entry.variants[encoding]
+    if body is None:
+        # Too large to keep in memory; send_file streams it and handles Range
+        response = send_file(entry.path, mimetype=entry.mimetype, etag=entry.etag, conditional=True)
+        response.headers['Cache-Control'] = entry.cache_control
+        return response
+    response = Response(body, mimetype=entry.mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    if len(entry.variants) > 1:
+        response.vary.add('Accept-Encoding')
+    response.set_etag(entry.etag if encoding == 'identity' else f"{entry.etag}-{encoding}")
+    response.last_modified = entry.last_modified
+    response.headers['Cache-Control'] = entry.cache_control
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+
+@frontend_bp.route('/', defaults={'path': ''})
+@frontend_bp.route('/<path:path>')
+def serve(path):
+    manifest = current_app.extensions['frontend_manifest']
+    entry = manifest.get(path)
+    if entry is not None:
+        return _file_response(entry)
+    if path == 'api' or path.startswith('api/'):
+        return jsonify({'error': 'Not found'}), 404
+    if '.' in path.rsplit('/', 1)[-1] or 'index.html' not in manifest:
+        return jsonify({'error': 'Not found'}), 404
+    return _file_response(manifest['index.html'])
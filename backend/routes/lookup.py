@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from services.lookup_service import LookupService
+
+lookup_bp = Blueprint('lookup', __name__)
+
+@lookup_bp.route('', methods=['GET'])
+@jwt_required()
+def lookup():
+    """
+    Typeahead: students, programs and colleges whose code or name starts
+    with ?q=. ?types= limits the groups searched (comma-separated) and
+    ?limit= the matches per group, capped at lookup_service.MAX_LIMIT.
+    """
+    try:
+        types = LookupService.parse_types(request.args.get('types', ''))
+        limit = LookupService.parse_limit(request.args.get('limit'))
+        results = LookupService.lookup(request.args.get('q', ''), types, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response = jsonify(results)
+    # Keystrokes repeat prefixes (backspace, retyping); a few seconds of staleness is fine here
+    response.headers['Cache-Control'] = 'private, max-age=5'
+    return response
@@ -0,0 +1,55 @@
+from flask import Blueprint, Response
+import metrics
+from db import get_pool
+from services.query_cache import get_query_cache
+import change_feed
+import os
+
+metrics_bp = Blueprint('metrics', __name__)
+
+POOL_EVENTS = ('checkouts', 'waits', 'timeouts', 'connects', 'failed_pings', 'reaped')
+CACHE_EVENTS = ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+
+def _state_samples():
+    # Identifies the worker answering this scrape (see metrics.py)
+    lines = metrics.render_samples('ssis_process_start_time_seconds', 'Start time of the process serving this scrape.', 'gauge', {
+        (('pid', os.getpid()),): metrics.PROCESS_START_TIME
+    })
+    # Pool and cache counters are kept by their owners; read them at scrape time
+    pool = get_pool().stats()
+    lines += metrics.render_samples('ssis_db_pool_connections', 'Pooled database connections by state.', 'gauge', {
+        (('state', 'idle'),): pool['idle'],
+        (('state', 'in_use'),): pool['in_use'],
+    })
+    lines += metrics.render_samples('ssis_db_pool_events_total', 'Connection pool events.', 'counter', {
+        (('event', name),): pool[name] for name in POOL_EVENTS
+    })
+    query_cache = get_query_cache()
+    if query_cache is not None:
+        stats = query_cache.stats()
+        lines += metrics.render_samples('ssis_query_cache_events_total', 'Query result cache events.', 'counter', {
+            (('event', name),): stats[name] for name in CACHE_EVENTS if name in stats
+        })
+        if 'size' in stats:
+            lines += metrics.render_samples('ssis_query_cache_entries', 'Entries held by the query result cache.', 'gauge', {
+                (): stats['size']
+            })
+    if change_feed.ENABLED:
+        feed = change_feed.get_change_feed().stats()
+        lines += metrics.render_samples('ssis_change_feed_subscribers', 'Open /api/events streams.', 'gauge', {
+            (): feed['subscribers']
+        })
+        lines += metrics.render_samples('ssis_change_feed_events_total', 'Change feed listener events.', 'counter', {
+            (('event', 'delivered'),): feed['delivered'],
+            (('event', 'reconnects'),): feed['reconnects'],
+        })
+    return lines
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus metrics for the process that serves the request. With
+    several gunicorn workers each scrape reaches one of them and reports
+    only that worker's figures; see metrics.py.
+    """
+    return Response(metrics.render(_state_samples()), mimetype='text/plain; version=0.0.4')
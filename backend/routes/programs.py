@@ -1,30 +1,75 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from services.program_service import ProgramService
+from routes.streaming import export_response, list_response
+from routes.conditional import conditional_get
+from services.list_query import parse_filters
+from services.pagination import check_page
 
 programs_bp = Blueprint('programs', __name__)
 
+PROGRAMS_EXPORT_COLUMNS = ['code', 'name', 'college_code', 'college_name', 'student_count', 'created_at']
+
 @programs_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional_get('programs', 'colleges')
 def get_programs():
     search = request.args.get('search', '').strip()
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     sort_by = request.args.get('sort_by', 'code')
     sort_order = request.args.get('sort_order', 'asc')
-    
-    result = ProgramService.get_all_programs(search, page, per_page, sort_by, sort_order)
-    
-    return jsonify({
-        'data': result['items'],
-        'meta': {
-            'page': result['page'],
+    page_cursor = request.args.get('cursor')
+    count = request.args.get('count', 'exact')
+    fields = request.args.get('fields')
+
+    if page_cursor is not None:
+        # Keyset pagination: pass cursor= (empty) for the first page, then next_cursor
+        try:
+            check_page(None, per_page)
+            filters = parse_filters(ProgramService.RESOURCE, request.args)
+            result = ProgramService.get_all_programs(search, None, per_page, sort_by, sort_order, filters, page_cursor=page_cursor, count=count, fields=fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return list_response(result['items'], {
             'per_page': result['per_page'],
-            'total_pages': result['pages'],
-            'total_items': result['total']
-        }
+            'total_items': result['total'],
+            'next_cursor': result['next_cursor']
+        })
+
+    try:
+        check_page(page, per_page)
+        filters = parse_filters(ProgramService.RESOURCE, request.args)
+        result = ProgramService.get_all_programs(search, page, per_page, sort_by, sort_order, filters, count=count, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return list_response(result['items'], {
+        'page': result['page'],
+        'per_page': result['per_page'],
+        'total_pages': result['pages'],
+        'total_items': result['total'],
+        'has_more': result['has_more']
     })
 
+@programs_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_programs():
+    try:
+        rows = ProgramService.export_programs(
+            request.args.get('search', '').strip(),
+            request.args.get('sort_by', 'code'),
+            request.args.get('sort_order', 'asc'),
+            parse_filters(ProgramService.RESOURCE, request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response = export_response(rows, PROGRAMS_EXPORT_COLUMNS, request.args.get('format', 'csv'), 'programs')
+    if response is None:
+        rows.close()
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    return response
+
 @programs_bp.route('', methods=['POST'])
 @jwt_required()
 def create_program():
@@ -0,0 +1,33 @@
+from flask import Response, current_app, jsonify, request, stream_with_context
+from services.bulk_io import csv_chunks, json_document_chunks, ndjson_chunks
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+def export_response(rows, columns, file_format, basename):
+    """
+    Streams ``rows`` (an iterator) as a chunked CSV or NDJSON download.
+    Returns None for an unsupported format so the caller can answer 400.
+    """
+    if file_format not in EXPORT_FORMATS:
+        return None
+    if file_format == 'csv':
+        body = csv_chunks(rows, columns)
+    else:
+        body = ndjson_chunks(rows, current_app.json.dumps)
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[file_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{basename}.{file_format}"'
+    return response
+
+def list_response(items, meta):
+    """
+    Returns the {"data": items, "meta": meta} list document. With
+    ?stream=true the body is encoded and sent row by row, which keeps
+    memory flat for large per_page values.
+    """
+    if request.args.get('stream', '').lower() not in ('1', 'true', 'yes'):
+        return jsonify({'data': items, 'meta': meta})
+    body = json_document_chunks(items, meta, current_app.json.dumps)
+    return Response(stream_with_context(body), mimetype='application/json')
@@ -1,30 +1,88 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from services.student_service import StudentService
+from routes.streaming import export_response, list_response
+from routes.conditional import conditional_get
+from services.list_query import parse_filters
+from services.pagination import check_page
 
 students_bp = Blueprint('students', __name__)
 
+STUDENTS_EXPORT_COLUMNS = ['id', 'first_name', 'last_name', 'year_level', 'gender', 'program_code', 'program_name', 'college_code', 'college_name', 'photo_url', 'created_at']
+
 @students_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional_get('students', 'programs', 'colleges')
 def get_students():
     search = request.args.get('search', '').strip()
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     sort_by = request.args.get('sort_by', 'id')
     sort_order = request.args.get('sort_order', 'asc')
-    
-    result = StudentService.get_all_students(search, page, per_page, sort_by, sort_order)
-    
-    return jsonify({
-        'data': result['items'],
-        'meta': {
-            'page': result['page'],
+    page_cursor = request.args.get('cursor')
+    count = request.args.get('count', 'exact')
+    fields = request.args.get('fields')
+
+    if page_cursor is not None:
+        # Keyset pagination: pass cursor= (empty) for the first page, then next_cursor
+        try:
+            check_page(None, per_page)
+            filters = parse_filters(StudentService.RESOURCE, request.args)
+            result = StudentService.get_all_students(search, None, per_page, sort_by, sort_order, filters, page_cursor=page_cursor, count=count, fields=fields)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return list_response(result['items'], {
             'per_page': result['per_page'],
-            'total_pages': result['pages'],
-            'total_items': result['total']
-        }
+            'total_items': result['total'],
+            'next_cursor': result['next_cursor']
+        })
+
+    try:
+        check_page(page, per_page)
+        filters = parse_filters(StudentService.RESOURCE, request.args)
+        result = StudentService.get_all_students(search, page, per_page, sort_by, sort_order, filters, count=count, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return list_response(result['items'], {
+        'page': result['page'],
+        'per_page': result['per_page'],
+        'total_pages': result['pages'],
+        'total_items': result['total'],
+        'has_more': result['has_more']
     })
 
+@students_bp.route('/facets', methods=['GET'])
+@jwt_required()
+@conditional_get('students', 'programs', 'colleges')
+def get_student_facets():
+    try:
+        facets = StudentService.get_student_facets(
+            request.args.get('search', '').strip(),
+            parse_filters(StudentService.RESOURCE, request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(facets)
+
+@students_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_students():
+    try:
+        rows = StudentService.export_students(
+            request.args.get('search', '').strip(),
+            request.args.get('sort_by', 'id'),
+            request.args.get('sort_order', 'asc'),
+            parse_filters(StudentService.RESOURCE, request.args)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response = export_response(rows, STUDENTS_EXPORT_COLUMNS, request.args.get('format', 'csv'), 'students')
+    if response is None:
+        rows.close()
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    return response
+
 @students_bp.route('', methods=['POST'])
 @jwt_required()
 def create_student():
@@ -38,6 +96,17 @@ def create_student():
         # In a real app, you would log the error `e` here
         return jsonify({'error': 'An internal server error occurred'}), 500
 
+@students_bp.route('/<id>', methods=['GET'])
+@jwt_required()
+def get_student(id):
+    try:
+        student = StudentService.get_student_by_id(id.strip().upper(), request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not student:
+        return jsonify({'error': 'Student not found'}), 404
+    return jsonify(student)
+
 @students_bp.route('/<id>', methods=['PUT'])
 @jwt_required()
 def update_student(id):
@@ -67,6 +136,41 @@ def delete_student(id):
     except Exception as e:
         return jsonify({'error': 'An internal server error occurred'}), 500
 
+@students_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_students():
+    data = request.json or {}
+    try:
+        outcome = StudentService.batch_write(data.get('operations'), data.get('mode', 'atomic'))
+        return jsonify(outcome), 200 if outcome['committed'] else 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'An internal server error occurred'}), 500
+
+@students_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_students():
+    # Accept a multipart upload (field "file") or the raw request body
+    upload = request.files.get('file')
+    if upload:
+        stream, filename, mimetype = upload.stream, upload.filename or '', upload.mimetype
+    else:
+        stream, filename, mimetype = request.stream, '', request.mimetype
+
+    file_format = request.args.get('format')
+    if not file_format:
+        is_ndjson = 'ndjson' in mimetype or filename.endswith(('.ndjson', '.jsonl'))
+        file_format = 'ndjson' if is_ndjson else 'csv'
+
+    try:
+        report = StudentService.import_students(stream, file_format, request.args.get('on_error', 'skip'))
+        return jsonify(report), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'An internal server error occurred'}), 500
+
 @students_bp.route('/bulk-delete', methods=['POST'])
 @jwt_required()
 def bulk_delete_students():
@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from db import get_pool
+from services.query_cache import get_query_cache
+from services.refdata import refdata
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route('/pool', methods=['GET'])
+@jwt_required()
+def get_pool_stats():
+    return jsonify(get_pool().stats())
+
+@system_bp.route('/cache', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    query_cache = get_query_cache()
+    return jsonify(query_cache.stats() if query_cache is not None else {'enabled': False})
+
+@system_bp.route('/refdata', methods=['GET'])
+@jwt_required()
+def get_refdata_stats():
+    return jsonify(refdata.stats())
@@ -0,0 +1,120 @@
+"""
+Streaming helpers for bulk import and export.
+
+Rows move through generators one at a time, so memory use does not depend
+on how large an upload or export is.
+"""
+import codecs
+import csv
+import io
+import json
+
+# Rows fetched per round trip by the server-side export cursors
+EXPORT_BATCH_SIZE = 2000
+# Approximate size of each chunk written to the response
+CHUNK_SIZE = 64 * 1024
+
+def iter_csv_rows(stream, columns):
+    """
+    Yields one dict per CSV data row of a binary ``stream`` with a header
+    line, restricted to ``columns`` and tagged with its ``line_no``.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        record = {column: row.get(column) for column in columns}
+        record['line_no'] = reader.line_num
+        yield record
+
+def iter_ndjson_rows(stream, columns):
+    """
+    Yields one dict per non-blank line of a binary NDJSON ``stream``.
+    Lines that are not JSON objects carry a ``parse_error`` instead.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    for line_no, line in enumerate(stream, start=1):
+        line = decoder.decode(line)
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield {'line_no': line_no, 'parse_error': 'Invalid JSON'}
+            continue
+        if not isinstance(row, dict):
+            yield {'line_no': line_no, 'parse_error': 'Expected a JSON object'}
+            continue
+        record = {column: None if row.get(column) is None else str(row[column]) for column in columns}
+        record['line_no'] = line_no
+        yield record
+
+class CopyStream:
+    """
+    A read-only file object that renders ``rows`` as CSV on demand, for
+    ``cursor.copy_expert('COPY ... FROM STDIN WITH (FORMAT csv)', ...)``.
+    Only one read-sized chunk is held in memory at a time.
+    """
+
+    def __init__(self, rows, columns):
+        self._rows = iter(rows)
+        self._columns = columns
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            # None and '' are both written unquoted, which COPY reads as NULL
+            self._writer.writerow([row.get(column) for column in self._columns])
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            chunk, self._pending = self._pending, ''
+        else:
+            chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+def _chunked(pieces):
+    # Coalesce many small strings into CHUNK_SIZE writes
+    buffered, size = [], 0
+    for piece in pieces:
+        buffered.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffered)
+            buffered, size = [], 0
+    if buffered:
+        yield ''.join(buffered)
+
+def csv_chunks(rows, columns):
+    """Renders ``rows`` as CSV text chunks, starting with a header line."""
+    def lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row.get(column) for column in columns])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    return _chunked(lines())
+
+def ndjson_chunks(rows, dumps):
+    """Renders ``rows`` as newline-delimited JSON text chunks using ``dumps``."""
+    return _chunked(dumps(row) + '\n' for row in rows)
+
+def json_document_chunks(items, meta, dumps):
+    """
+    Renders {"data": [items...], "meta": meta} as JSON text chunks, encoding
+    one item at a time with ``dumps`` instead of the whole document at once.
+    """
+    def pieces():
+        yield '{"data":['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + dumps(item)
+        yield '],"meta":' + dumps(meta) + '}\n'
+    return _chunked(pieces())
@@ -0,0 +1,430 @@
+"""
+Declarative list queries shared by the student, program and college services.
+
+Each service declares its list once as a Resource: the fields a client may
+select, sort, filter and search on, and the joins some of them need. From
+a request's search term, filters, sort and field selection, build() makes
+a Query, and fetch() runs it as a plain, OFFSET-paginated or
+keyset-paginated list with the helpers in services.pagination.
+
+The SQL depends only on the request's shape (which fields, which filter
+operators, which sort, whether there is a search), never on its values,
+so it is compiled once per shape and kept in an LRU cache.
+
+Filters come from query-string arguments (see parse_filters):
+    year_level=3            equal
+    year_level[gte]=3       also gt, lt, lte, ne
+    year_level>=3           the same, in comparison form (also >, <, <=, !=)
+    gender[in]=Male,Female  any of a comma-separated list
+    gender=Male&gender=Female
+Sorts are comma-separated field names, each optionally prefixed with "-"
+(descending) or "+" (ascending). The resource key is always appended as
+the tie-breaker, so pages are stable.
+"""
+import functools
+import re
+from datetime import datetime
+from db import get_connection
+from psycopg2.extras import RealDictCursor
+from services.bulk_io import EXPORT_BATCH_SIZE
+from services.pagination import keyset_page, offset_page, order_by_clause
+from services.search import contains_pattern, relevance_sql, search_sql
+
+OPERATORS = {'eq': '=', 'ne': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=', 'in': '= ANY'}
+EQUALITY = ('eq', 'ne', 'in')
+RANGE = ('eq', 'ne', 'in', 'gt', 'gte', 'lt', 'lte')
+# Comparison-form arguments: "a>=3" arrives as key "a>" and value "3", "a>3" as key "a>3"
+_COMPARISON_KEYS = {'>': 'gte', '<': 'lte', '!': 'ne'}
+_COMPARISON = re.compile(r'^(\w+)(>|<)(.+)$')
+_BRACKETED = re.compile(r'^(\w+)\[(\w+)\]$')
+# Upper bound on values in one IN filter
+MAX_IN_VALUES = 500
+
+def timestamp(value):
+    """
+    Filter value type for the TIMESTAMP (without time zone) columns: an
+    ISO 8601 date or date and time, e.g. 2024-06-01 or 2024-06-01T08:30.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        raise ValueError('timestamps are stored without a time zone')
+    return parsed
+
+class Field:
+    """
+    A column of a list resource.
+
+    ``join`` names the Resource join the expression needs. A joined field
+    marked ``resolved`` is filled in by the resource's resolver instead
+    of joining, unless the query joins anyway (to sort or filter on it).
+    ``filters`` lists the operators clients may filter with and ``type``
+    converts filter values. ``nullable`` matters for keyset pagination.
+    """
+    def __init__(self, expr, join=None, sortable=True, searchable=False, filters=(), type=str,
+                 nullable=False, resolved=False):
+        self.expr = expr
+        self.join = join
+        self.sortable = sortable
+        self.searchable = searchable
+        self.filters = filters
+        self.type = type
+        self.nullable = nullable
+        self.resolved = resolved
+
+class Resource:
+    """
+    A list endpoint's declaration. ``table`` is the FROM item (with its
+    alias), ``key`` the unique field used as the tie-breaker and
+    ``fields`` an ordered {name: Field}. ``joins`` maps a join name to
+    (join clause, name of a join it depends on or None). ``select_all``
+    selects every base-table field at once. ``resolver(rows, fields,
+    drop_key)`` fills resolved fields into fetched rows, reading them
+    from ``resolver_key``.
+    """
+    def __init__(self, name, table, key, fields, select_all, joins=None, resolver=None, resolver_key=None):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.fields = fields
+        self.select_all = select_all
+        self.joins = joins or {}
+        self.resolver = resolver
+        self.resolver_key = resolver_key
+
+    def __repr__(self):
+        return f"Resource({self.name!r})"
+
+def parse_fields(resource, fields):
+    """
+    Parses a comma-separated ``fields`` value into a tuple of field names.
+    Returns None (every field) when empty.
+    Raises ValueError for a field the resource does not have.
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(name for name in resource.fields if name in names) or None
+
+def parse_sort(resource, sort_by, sort_order='asc'):
+    """
+    Parses ``sort_by`` into a tuple of (name, descending) ending with the
+    resource key. Unprefixed fields sort in ``sort_order``; the key takes
+    the direction of the last field before it.
+    Raises ValueError for a field that cannot be sorted on.
+    """
+    default_descending = sort_order == 'desc'
+    sort = []
+    for term in (sort_by or resource.key).split(','):
+        term = term.strip()
+        if not term:
+            continue
+        descending = default_descending
+        if term[0] in '+-':
+            descending, term = term[0] == '-', term[1:]
+        field = resource.fields.get(term)
+        if field is None or not field.sortable:
+            raise ValueError(f"Cannot sort by: {term}")
+        if term in (name for name, _ in sort):
+            continue
+        sort.append((term, descending))
+        if term == resource.key:
+            break
+    if not sort or sort[-1][0] != resource.key:
+        sort.append((resource.key, sort[-1][1] if sort else default_descending))
+    return tuple(sort)
+
+def _convert(field, name, value):
+    try:
+        return field.type(value.strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for {name}: {value}")
+
+def parse_filters(resource, args):
+    """
+    Reads the filters in ``args`` (a MultiDict, e.g. request.args) into a
+    tuple of (name, operator, value) sorted by name and operator, with a
+    tuple of values for 'in'. Arguments that name no filterable field are
+    ignored, as are empty values.
+    Raises ValueError for an operator the field does not allow or a value
+    of the wrong type.
+    """
+    filters = {}
+    for key in args:
+        values = [value for value in args.getlist(key) if value.strip()]
+        match = _BRACKETED.match(key)
+        if match:
+            name, operator = match.groups()
+        elif key[-1:] in _COMPARISON_KEYS and key[:-1] in resource.fields:
+            name, operator = key[:-1], _COMPARISON_KEYS[key[-1]]
+        elif not values and _COMPARISON.match(key):
+            name, symbol, value = _COMPARISON.match(key).groups()
+            operator, values = ('gt' if symbol == '>' else 'lt'), [value]
+        else:
+            name, operator = key, 'eq'
+        field = resource.fields.get(name)
+        if field is None or not field.filters or not values:
+            continue
+        if operator not in OPERATORS or operator not in field.filters:
+            raise ValueError(f"Unsupported filter: {name}[{operator}]")
+
+        if operator == 'in' or (operator == 'eq' and len(values) > 1):
+            items = [item for value in values for item in (value.split(',') if operator == 'in' else [value])]
+            items = [item for item in items if item.strip()]
+            if len(items) > MAX_IN_VALUES:
+                raise ValueError(f"A filter may list at most {MAX_IN_VALUES} values")
+            operator = 'in'
+            filters[name, operator] = tuple(sorted({_convert(field, name, item) for item in items}))
+        else:
+            filters[name, operator] = _convert(field, name, values[-1])
+    return tuple((name, operator, value) for (name, operator), value in sorted(filters.items()))
+
+class Query:
+    """A compiled list query plus the parameter values for one request."""
+    def __init__(self, compiled, params):
+        self.select, self.body, self.conditions, self.order_by, self.order, self.resolve = compiled
+        self.params = params
+
+    def where_body(self):
+        """The FROM clause with the conditions applied."""
+        if not self.conditions:
+            return self.body
+        return f"{self.body} WHERE " + " AND ".join(self.conditions)
+
+    def finish(self, result):
+        """Fills resolved fields into ``result`` (a page dict or a row list) and returns it."""
+        if self.resolve is not None:
+            self.resolve(result['items'] if isinstance(result, dict) else result)
+        return result
+
+def _join_clauses(resource, names):
+    # Dependencies first, each join once
+    needed = []
+    def add(name):
+        if name and name not in needed:
+            add(resource.joins[name][1])
+            needed.append(name)
+    for name in names:
+        add(name)
+    return needed
+
+def _select_item(field, name):
+    if field.expr.endswith('.' + name):
+        return field.expr
+    return f"{field.expr} as {name}"
+
+def projection(resource, fields, required=(), joins=()):
+    """
+    Returns (select, body, resolve) for ``fields`` (a parse_fields result)
+    plus the ``required`` field names, joining ``joins`` in any case.
+
+    Resolved fields are left out of the query when nothing else needs
+    their joins: ``resolve`` (None if there is nothing to fill) then adds
+    them to the fetched rows. Otherwise they are selected from the join.
+    """
+    names = list(resource.fields) if fields is None else list(fields)
+    for name in required:
+        if name in resource.fields and name not in names:
+            names.append(name)
+
+    resolve = None
+    joins = list(joins)
+    if resource.resolver is not None and not joins:
+        resolved = tuple(name for name in names if resource.fields[name].resolved)
+        if resolved:
+            names = [name for name in names if name not in resolved]
+            drop_key = resource.resolver_key not in names
+            if drop_key:
+                names.append(resource.resolver_key)
+            resolve = functools.partial(resource.resolver, fields=resolved, drop_key=drop_key)
+    joins += [resource.fields[name].join for name in names]
+
+    if fields is None:
+        items = [resource.select_all] + [
+            _select_item(resource.fields[name], name) for name in names if resource.fields[name].join
+        ]
+    else:
+        items = [_select_item(resource.fields[name], name) for name in names]
+    body = f"""
+            FROM {resource.table}
+        """
+    for join in _join_clauses(resource, joins):
+        body += f"""    {resource.joins[join][0]}
+        """
+    return "SELECT " + ", ".join(items), body, resolve
+
+def _filter_sql(field, operator):
+    placeholder = "(%s)" if operator == 'in' else "%s"
+    return f"{field.expr} {OPERATORS[operator]} {placeholder}"
+
+def _check_filters(resource, filters):
+    filters = tuple(filters)
+    for name, operator, _ in filters:
+        field = resource.fields.get(name)
+        if field is None or operator not in field.filters:
+            raise ValueError(f"Unsupported filter: {name}[{operator}]")
+    return filters
+
+def _filter_params(filters):
+    return [list(value) if operator == 'in' else value for _, operator, value in filters]
+
+@functools.lru_cache(maxsize=512)
+def _compile(resource, fields, filter_shape, sort, search, relevance):
+    field_map = resource.fields
+    # Joins needed to sort or filter; projection() adds those of selected fields
+    joins = [field_map[name].join for name, _ in sort] + [field_map[name].join for name, _ in filter_shape]
+    select, body, resolve = projection(
+        resource, fields, required=[name for name, _ in sort], joins=[join for join in joins if join]
+    )
+
+    search_columns = [field.expr for field in field_map.values() if field.searchable]
+    conditions = []
+    if search:
+        if relevance:
+            select += relevance_sql(search_columns)
+        conditions.append(search_sql(search_columns))
+    conditions.extend(_filter_sql(field_map[name], operator) for name, operator in filter_shape)
+
+    order = tuple((name, field_map[name].expr, descending, field_map[name].nullable) for name, descending in sort)
+    if relevance:
+        key = field_map[resource.key].expr
+        order_by = f"ORDER BY relevance DESC, {key} ASC"
+    else:
+        order_by = order_by_clause(order)
+    return select, body, tuple(conditions), order_by, order, resolve
+
+def build(resource, search_term=None, sort_by=None, sort_order='asc', filters=(), fields=None, keyset=False):
+    """
+    Builds the Query for a list request. ``filters`` is a parse_filters
+    result and ``fields`` a comma-separated field list (default: all).
+    With a search term, sort_by='relevance' ranks the closest matches
+    first; keyset pages cannot, and sort by the key instead.
+    Raises ValueError for an unknown field, sort or filter.
+    """
+    relevance = bool(search_term) and sort_by == 'relevance' and not keyset
+    sort = parse_sort(resource, None if sort_by == 'relevance' else sort_by, sort_order)
+    filters = _check_filters(resource, filters)
+    compiled = _compile(
+        resource, parse_fields(resource, fields), tuple((name, operator) for name, operator, _ in filters),
+        sort, bool(search_term), relevance
+    )
+
+    params = []
+    if search_term:
+        searchable = sum(1 for field in resource.fields.values() if field.searchable)
+        if relevance:
+            params.extend([search_term] * searchable)
+        params.extend([contains_pattern(search_term)] * searchable)
+    params.extend(_filter_params(filters))
+    return Query(compiled, params)
+
+def fetch(cursor, query, page=None, per_page=None, page_cursor=None, count='exact'):
+    """
+    Runs ``query`` on ``cursor``: by keyset when ``page_cursor`` is given
+    ('' for the first page), by OFFSET when ``page`` is, otherwise as one
+    list. ``count`` is 'exact', 'estimate' or 'none' (see count_rows).
+    Call query.finish() on the result once the connection is released.
+    """
+    if page_cursor is not None and per_page is not None:
+        return keyset_page(
+            cursor, query.select, query.body, query.conditions, query.params, per_page, page_cursor,
+            query.order, count
+        )
+    if page is not None and per_page is not None:
+        return offset_page(cursor, query.select, query.where_body(), query.order_by, query.params, page, per_page, count)
+    cursor.execute(f"{query.select} {query.where_body()} {query.order_by}", tuple(query.params))
+    return cursor.fetchall()
+
+@functools.lru_cache(maxsize=128)
+def _compile_facets(resource, facets, filter_shape, search):
+    field_map = resource.fields
+    joins = [field_map[name].join for name in facets] + [field_map[name].join for name, _ in filter_shape]
+    body = f"FROM {resource.table}"
+    for join in _join_clauses(resource, [join for join in joins if join]):
+        body += f" {resource.joins[join][0]}"
+
+    # Slot 0 holds the search pattern, slot i the i-th filter's value
+    search_columns = [field.expr for field in field_map.values() if field.searchable]
+    where, where_slots = [], []
+    if search:
+        where.append(search_sql(search_columns))
+        where_slots += [0] * len(search_columns)
+    # Filters on a facet's own field are left out of that facet's counts
+    faceted = []
+    for slot, (name, operator) in enumerate(filter_shape, 1):
+        if name in facets:
+            faceted.append((name, _filter_sql(field_map[name], operator), slot))
+        else:
+            where.append(_filter_sql(field_map[name], operator))
+            where_slots.append(slot)
+
+    columns, select_slots = [], []
+    for name in list(facets) + [None]:
+        others = [(sql, slot) for facet, sql, slot in faceted if facet != name]
+        alias = f"{name}_count" if name else "total"
+        if others:
+            columns.append(f"COUNT(*) FILTER (WHERE {' AND '.join(sql for sql, _ in others)}) AS {alias}")
+            select_slots += [slot for _, slot in others]
+        else:
+            columns.append(f"COUNT(*) AS {alias}")
+    expressions = [field_map[name].expr for name in facets]
+    sets = ", ".join(f"({expression})" for expression in expressions)
+    sql = (
+        f"SELECT GROUPING({', '.join(expressions)}) AS grouping_set, "
+        + ", ".join(f"{expression} AS {name}" for expression, name in zip(expressions, facets)) + ", "
+        + ", ".join(columns) + f" {body}"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + f" GROUP BY GROUPING SETS ({sets}, ())"
+    )
+    return sql, tuple(select_slots + where_slots)
+
+def facet_counts(cursor, resource, facets, search_term=None, filters=()):
+    """
+    Counts the rows matching ``search_term`` and ``filters`` per value of
+    each field in ``facets``, in one GROUPING SETS query. A facet's counts
+    ignore the filters on its own field, so they show what choosing
+    another value would give. Returns ({facet: {value: count}}, total),
+    where total applies every filter. Values with no matching rows are
+    left out.
+    Raises ValueError for an unknown facet or filter.
+    """
+    unknown = [name for name in facets if name not in resource.fields]
+    if unknown:
+        raise ValueError(f"Unknown facets: {', '.join(unknown)}")
+    facets = tuple(facets)
+    filters = _check_filters(resource, filters)
+    sql, slots = _compile_facets(
+        resource, facets, tuple((name, operator) for name, operator, _ in filters), bool(search_term)
+    )
+    values = [contains_pattern(search_term) if search_term else None] + _filter_params(filters)
+    cursor.execute(sql, tuple(values[slot] for slot in slots))
+
+    # GROUPING() sets a bit, most significant first, for each facet left out of the row's set
+    everything = (1 << len(facets)) - 1
+    sets = {everything ^ (1 << (len(facets) - 1 - i)): name for i, name in enumerate(facets)}
+    counts = {name: {} for name in facets}
+    total = 0
+    for row in cursor.fetchall():
+        name = sets.get(row['grouping_set'])
+        if name is None:
+            total = row['total']
+        elif row[f"{name}_count"]:
+            counts[name][row[name]] = row[f"{name}_count"]
+    return counts, total
+
+def export(query, cursor_name):
+    """
+    Yields every row of ``query``, in order, without loading them all.
+    Rows are pulled from a server-side cursor in batches of EXPORT_BATCH_SIZE;
+    the pooled connection is held until the generator is exhausted or closed.
+    """
+    with get_connection() as conn, conn.cursor(name=cursor_name, cursor_factory=RealDictCursor) as cursor:
+        cursor.itersize = EXPORT_BATCH_SIZE
+        cursor.execute(f"{query.select} {query.where_body()} {query.order_by}", tuple(query.params))
+        if query.resolve is None:
+            yield from cursor
+        else:
+            for row in cursor:
+                yield query.resolve([row])[0]
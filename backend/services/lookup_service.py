@@ -0,0 +1,156 @@
+"""
+Typeahead lookups for GET /api/lookup.
+
+Students are matched by ID, name or "first last" prefix against the
+text_pattern_ops indexes in db.PREFIX_INDEXES. Each branch of the query
+is an index range scan read in index order and cut off at the limit, so
+its cost does not grow with the table. Programs and colleges, a few
+hundred rows at most, are answered without a query from sorted prefix
+lists built over the reference data (services/refdata.py).
+"""
+import bisect
+import os
+import re
+from db import get_connection
+from psycopg2.extras import RealDictCursor
+from services.refdata import refdata
+from services.search import prefix_pattern
+
+TYPES = ('students', 'programs', 'colleges')
+DEFAULT_LIMIT = 8
+# Hard cap on results per type, whatever the client asks for
+MAX_LIMIT = int(os.getenv('LOOKUP_MAX_LIMIT', 20))
+MAX_QUERY_LENGTH = 100
+STUDENT_ID_PREFIX = re.compile(r'^[0-9-]+$')
+
+class PrefixIndex:
+    """
+    Sorted (key, rank, code) entries for a {code: name} mapping: one for
+    the code (rank 0), one for the whole name (rank 1) and one for each
+    later word of the name (rank 2). A prefix lookup is a bisect to the
+    first match plus a scan over the matches.
+    """
+    def __init__(self, names):
+        entries = []
+        for code, name in names.items():
+            entries.append((code.lower(), 0, code))
+            words = (name or '').lower().split()
+            if words:
+                entries.append((' '.join(words), 1, code))
+            entries.extend((word, 2, code) for word in words[1:])
+        entries.sort()
+        self._entries = entries
+
+    def search(self, prefix, limit):
+        """Returns up to ``limit`` codes matching ``prefix``: exact code, code, name, then word matches."""
+        ranks = {}
+        i = bisect.bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and self._entries[i][0].startswith(prefix):
+            key, rank, code = self._entries[i]
+            if rank == 0 and key == prefix:
+                rank = -1
+            if rank < ranks.get(code, 3):
+                ranks[code] = rank
+            i += 1
+        return sorted(ranks, key=lambda code: (ranks[code], code))[:limit]
+
+# (snapshot, programs PrefixIndex, colleges PrefixIndex), rebuilt when refdata reloads
+_prefix_indexes = (None, None, None)
+
+def _indexes():
+    global _prefix_indexes
+    snapshot = refdata.snapshot()
+    indexes = _prefix_indexes
+    if indexes[0] is not snapshot:
+        programs = PrefixIndex({code: name for code, (name, _) in snapshot.programs.items()})
+        colleges = PrefixIndex(snapshot.colleges)
+        indexes = _prefix_indexes = (snapshot, programs, colleges)
+    return indexes
+
+# Each branch matches one prefix index and reads it in order (~<~ is the
+# text_pattern_ops ordering), stopping at the limit. The id tie-breaker
+# makes the cut at the limit the same on every call.
+STUDENT_BRANCHES = {
+    'id': "id LIKE %s ORDER BY id USING ~<~",
+    'full_name': "lower(first_name) LIKE %s AND lower(last_name) LIKE %s ORDER BY lower(last_name) USING ~<~, id",
+    'last_name': "lower(last_name) LIKE %s ORDER BY lower(last_name) USING ~<~, id",
+    'first_name': "lower(first_name) LIKE %s ORDER BY lower(first_name) USING ~<~, id",
+}
+
+class LookupService:
+    @staticmethod
+    def parse_limit(limit):
+        """Clamps a requested limit to 1..MAX_LIMIT. Raises ValueError if it is not a number."""
+        if limit in (None, ''):
+            return DEFAULT_LIMIT
+        try:
+            return max(1, min(int(limit), MAX_LIMIT))
+        except (TypeError, ValueError):
+            raise ValueError('limit must be a whole number')
+
+    @staticmethod
+    def parse_types(types):
+        """Parses a comma-separated ``types`` value. Returns TYPES when empty."""
+        if not types:
+            return TYPES
+        names = [name.strip() for name in types.split(',') if name.strip()]
+        unknown = [name for name in names if name not in TYPES]
+        if unknown:
+            raise ValueError(f"Unknown lookup types: {', '.join(unknown)}")
+        return tuple(name for name in TYPES if name in names)
+
+    @staticmethod
+    def lookup(q, types=TYPES, limit=DEFAULT_LIMIT):
+        """Returns {type: [matches]} for the prefix ``q``; empty lists for an empty ``q``."""
+        prefix = ' '.join(q.split())[:MAX_QUERY_LENGTH].lower()
+        results = {name: [] for name in types}
+        if not prefix:
+            return results
+        if 'programs' in types or 'colleges' in types:
+            snapshot, programs, colleges = _indexes()
+            if 'programs' in types:
+                results['programs'] = [
+                    {'code': code, 'name': snapshot.programs[code][0], 'college_code': snapshot.programs[code][1]}
+                    for code in programs.search(prefix, limit)
+                ]
+            if 'colleges' in types:
+                results['colleges'] = [
+                    {'code': code, 'name': snapshot.colleges[code]} for code in colleges.search(prefix, limit)
+                ]
+        if 'students' in types:
+            results['students'] = LookupService.lookup_students(prefix, limit)
+        return results
+
+    @staticmethod
+    def lookup_students(prefix, limit):
+        """Students whose ID, first or last name, or "first last" starts with ``prefix``, best first."""
+        branches = []
+        if STUDENT_ID_PREFIX.match(prefix):
+            branches.append(('id', [prefix_pattern(prefix.upper())]))
+        else:
+            if ' ' in prefix:
+                first, last = prefix.split(' ', 1)
+                branches.append(('full_name', [prefix_pattern(first), prefix_pattern(last)]))
+            branches.append(('last_name', [prefix_pattern(prefix)]))
+            branches.append(('first_name', [prefix_pattern(prefix)]))
+
+        query = " UNION ALL ".join(
+            f"(SELECT id, first_name, last_name, program_code, {rank} AS rank FROM students "
+            f"WHERE {STUDENT_BRANCHES[name]} LIMIT %s)"
+            for rank, (name, _) in enumerate(branches)
+        )
+        params = [param for _, branch_params in branches for param in branch_params + [limit]]
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(
+                f"SELECT * FROM ({query}) matches ORDER BY rank, lower(last_name), lower(first_name), id",
+                tuple(params)
+            )
+            rows = cursor.fetchall()
+
+        students, seen = [], set()
+        for row in rows:
+            if row['id'] not in seen:
+                seen.add(row['id'])
+                del row['rank']
+                students.append(row)
+        return refdata.resolve_names(students[:limit], fields=('program_name',))
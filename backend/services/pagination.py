@@ -0,0 +1,203 @@
+import base64
+import json
+import math
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+def sort_signature(order):
+    """Describes a keyset ``order`` (see keyset_condition) as e.g. 'year_level:desc,id:desc'."""
+    return ','.join(f"{name}:{'desc' if descending else 'asc'}" for name, _, descending, _ in order)
+
+def encode_cursor(order, values):
+    """Encodes the position after the last row of a page (its sort values) as an opaque token."""
+    payload = json.dumps([sort_signature(order), values], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, order):
+    """
+    Decodes a token produced by encode_cursor into the list of sort values.
+    Returns None for an empty token (first page).
+    Raises ValueError if the token is malformed or was issued for another sort.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        signature, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid pagination cursor')
+    if signature != sort_signature(order) or not isinstance(values, list) or len(values) != len(order):
+        raise ValueError('Pagination cursor does not match the requested sort order')
+    return values
+
+def _after(expr, descending, nullable, value):
+    # Rows strictly after ``value`` in one column. PostgreSQL's default NULL
+    # placement applies: NULLs sort last when ascending, first when descending.
+    if descending:
+        if value is None:
+            return f"{expr} IS NOT NULL", []
+        return f"{expr} < %s", [value]
+    if value is None:
+        return None, []
+    if nullable:
+        return f"({expr} > %s OR {expr} IS NULL)", [value]
+    return f"{expr} > %s", [value]
+
+def keyset_condition(order, position):
+    """
+    Builds the WHERE condition selecting the rows after ``position`` (one
+    value per column) for ``order``: a list of (name, expr, descending,
+    nullable) ending with a unique, non-null key.
+
+    When every column sorts the same way and none is nullable this is a
+    single row comparison, which an index on those columns can answer.
+    """
+    if len({descending for _, _, descending, _ in order}) == 1 and not any(nullable for *_, nullable in order):
+        operator = '<' if order[0][2] else '>'
+        if len(order) == 1:
+            return f"{order[0][1]} {operator} %s", list(position)
+        columns = ", ".join(expr for _, expr, _, _ in order)
+        placeholders = ", ".join(['%s'] * len(order))
+        return f"({columns}) {operator} ({placeholders})", list(position)
+
+    (_, key_expr, key_descending, _), key_value = order[-1], position[-1]
+    condition, params = _after(key_expr, key_descending, False, key_value)
+    for (_, expr, descending, nullable), value in reversed(list(zip(order[:-1], position[:-1]))):
+        after, after_params = _after(expr, descending, nullable, value)
+        if value is None:
+            equal, equal_params = f"{expr} IS NULL", []
+        else:
+            equal, equal_params = f"{expr} = %s", [value]
+        tie = f"({equal} AND {condition})"
+        if after is None:
+            condition, params = tie, equal_params + params
+        else:
+            condition, params = f"({after} OR {tie})", after_params + equal_params + params
+    return condition, params
+
+def order_by_clause(order):
+    return "ORDER BY " + ", ".join(f"{expr} {'DESC' if descending else 'ASC'}" for _, expr, descending, _ in order)
+
+def count_rows(cursor, query, params, count='exact'):
+    """
+    Counts the rows ``query`` would return.
+    'exact' runs COUNT(*), 'estimate' reads the planner's row estimate and
+    'none' skips counting and returns None.
+    """
+    if count == 'none':
+        return None
+    if count == 'estimate':
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", tuple(params))
+        plan = cursor.fetchone()
+        plan = plan['QUERY PLAN'] if isinstance(plan, dict) else plan[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    cursor.execute(f"SELECT COUNT(*) as total FROM ({query}) as subquery", tuple(params))
+    return cursor.fetchone()['total']
+
+def check_count_mode(count):
+    if count not in COUNT_MODES:
+        raise ValueError(f"count must be one of: {', '.join(COUNT_MODES)}")
+
+def check_page(page, per_page):
+    """Rejects page sizes and page numbers below 1. ``page`` is None on the keyset path."""
+    if per_page is None or per_page < 1:
+        raise ValueError('per_page must be a whole number of at least 1')
+    if page is not None and page < 1:
+        raise ValueError('page must be a whole number of at least 1')
+
+def offset_page(cursor, select, body, order_by, params, page, per_page, count='exact'):
+    """
+    Runs ``select + body`` as an OFFSET-paginated list and returns the page dict.
+
+    With count='exact' the total comes from a COUNT(*) OVER() window on the
+    page query itself, so the filtered query runs once instead of twice.
+    """
+    check_count_mode(count)
+    offset = (page - 1) * per_page
+    window = ", COUNT(*) OVER() as total_count" if count == 'exact' else ""
+    # Fetch one extra row to learn whether another page follows
+    cursor.execute(
+        f"{select}{window} {body} {order_by} LIMIT %s OFFSET %s",
+        tuple(params) + (per_page + 1, offset)
+    )
+    items = cursor.fetchall()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+
+    if count == 'exact':
+        if items:
+            total = items[0]['total_count']
+            for item in items:
+                del item['total_count']
+        elif page > 1:
+            # Past the last page the window has no rows to report on
+            total = count_rows(cursor, f"{select} {body}", params)
+        else:
+            total = 0
+    elif count == 'estimate':
+        total = count_rows(cursor, f"{select} {body}", params, 'estimate')
+        if not has_more:
+            total = offset + len(items) if items else min(total, offset)
+        else:
+            total = max(total, offset + len(items) + 1)
+    else:
+        total = None
+
+    return {
+        'items': items,
+        'total': total,
+        'pages': math.ceil(total / per_page) if total is not None else None,
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    }
+
+def keyset_page(cursor, select, body, conditions, params, per_page, token, order, count='exact'):
+    """
+    Runs ``select + body`` as a keyset-paginated list and returns the page dict.
+
+    ``conditions`` are the caller's filters; the keyset condition is added
+    on top of them so the total still reflects the whole filtered set.
+    ``order`` is the sort (see keyset_condition); the result rows must
+    hold each of its names, since the next cursor is read from them.
+    """
+    check_count_mode(count)
+    position = decode_cursor(token, order)
+    query = f"{select} {body}"
+
+    count_query = query
+    if conditions:
+        count_query += " WHERE " + " AND ".join(conditions)
+    total = count_rows(cursor, count_query, params, count)
+
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if position is not None:
+        condition, condition_params = keyset_condition(order, position)
+        page_conditions.append(condition)
+        page_params.extend(condition_params)
+
+    if page_conditions:
+        query += " WHERE " + " AND ".join(page_conditions)
+    query += " " + order_by_clause(order)
+    # Fetch one extra row to learn whether another page follows
+    query += " LIMIT %s"
+    page_params.append(per_page + 1)
+
+    cursor.execute(query, tuple(page_params))
+    items = cursor.fetchall()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(order, [last[name] for name, _, _, _ in order])
+
+    return {
+        'items': items,
+        'total': total,
+        'per_page': per_page,
+        'next_cursor': next_cursor
+    }
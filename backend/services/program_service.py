@@ -1,79 +1,57 @@
-from db import get_db_connection
+from db import get_connection
 from psycopg2.extras import RealDictCursor
-import math
+from signals import data_changed
+from services.query_cache import cached_query
+from services.refdata import refdata
+from services import list_query
+from services.list_query import Field
+import psycopg2
 
 class ProgramService:
+    # student_count is a trigger-maintained column (see db.COUNTERS)
+    RESOURCE = list_query.Resource(
+        'programs', 'programs p', 'code',
+        fields={
+            'code': Field('p.code', searchable=True, filters=list_query.EQUALITY),
+            'name': Field('p.name', searchable=True),
+            'college_code': Field('p.college_code', filters=list_query.EQUALITY, nullable=True),
+            'college_name': Field('c.name', join='c', nullable=True),
+            'student_count': Field('p.student_count', type=int, filters=list_query.RANGE),
+            'created_at': Field('p.created_at', type=list_query.timestamp, filters=list_query.RANGE),
+        },
+        select_all='p.*',
+        joins={'c': ('LEFT JOIN colleges c ON p.college_code = c.code', None)}
+    )
+
+    @staticmethod
+    @cached_query('programs', 'colleges', 'students')
+    def get_all_programs(search_term=None, page=None, per_page=None, sort_by='code', sort_order='asc', filters=(), page_cursor=None, count='exact', fields=None):
+        """
+        Retrieves all programs, with an optional search, filters and sorting.
+        Pages by OFFSET when ``page`` is given, or by keyset when ``page_cursor`` is given.
+        """
+        query = list_query.build(
+            ProgramService.RESOURCE, search_term, sort_by, sort_order, filters, fields, keyset=page_cursor is not None
+        )
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            result = list_query.fetch(cursor, query, page, per_page, page_cursor, count)
+        return query.finish(result)
+
     @staticmethod
-    def get_all_programs(search_term=None, page=None, per_page=None, sort_by='code', sort_order='asc'):
-        """Retrieves all programs, with an optional search filter and sorting."""
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            # Base query with join for college name sorting/display
-            query = """
-                SELECT p.*, c.name as college_name, COUNT(s.id) as student_count
-                FROM programs p 
-                LEFT JOIN colleges c ON p.college_code = c.code
-                LEFT JOIN students s ON p.code = s.program_code
-            """
-            params = []
-            where_clauses = []
-            
-            if search_term:
-                term = f"%{search_term}%"
-                where_clauses.append("(p.code ILIKE %s OR p.name ILIKE %s)")
-                params.extend([term, term])
-            
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
-            
-            query += " GROUP BY p.code, c.name"
-            
-            # Sorting logic
-            if sort_by == 'college_name':
-                query += f" ORDER BY c.name {'DESC' if sort_order == 'desc' else 'ASC'}"
-            else:
-                valid_columns = {'code': 'p.code', 'name': 'p.name', 'college_code': 'p.college_code', 'student_count': 'student_count'}
-                col = valid_columns.get(sort_by, 'p.code')
-                query += f" ORDER BY {col} {'DESC' if sort_order == 'desc' else 'ASC'}"
-            
-            if page is not None and per_page is not None:
-                count_query = f"SELECT COUNT(*) as total FROM ({query}) as subquery"
-                cursor.execute(count_query, tuple(params))
-                total = cursor.fetchone()['total']
-                
-                query += " LIMIT %s OFFSET %s"
-                offset = (page - 1) * per_page
-                params.extend([per_page, offset])
-                
-                cursor.execute(query, tuple(params))
-                items = cursor.fetchall()
-                
-                return {
-                    'items': items,
-                    'total': total,
-                    'pages': math.ceil(total / per_page),
-                    'page': page,
-                    'per_page': per_page
-                }
-            
-            cursor.execute(query, tuple(params))
-            return cursor.fetchall()
-        finally:
-            cursor.close()
-            conn.close()
+    def export_programs(search_term=None, sort_by='code', sort_order='asc', filters=()):
+        """
+        Returns a generator of every matching program, in order (see list_query.export).
+        Raises ValueError for an unknown sort or filter before anything is read.
+        """
+        query = list_query.build(ProgramService.RESOURCE, search_term, sort_by, sort_order, filters)
+        return list_query.export(query, 'program_export')
 
     @staticmethod
     def get_program_by_code(code):
         """Retrieves a single program by its code."""
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
             cursor.execute("SELECT * FROM programs WHERE code = %s", (code,))
             return cursor.fetchone()
-        finally:
-            cursor.close()
-            conn.close()
 
     @staticmethod
     def create_program(data):
@@ -85,101 +63,91 @@ class ProgramService:
         name = data['name'].strip()
         college_code = data['college_code'].strip().upper()
 
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            cursor.execute("SELECT code FROM programs WHERE code = %s", (program_code,))
-            if cursor.fetchone():
-                raise ValueError('Program code already exists')
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                cursor.execute("SELECT code FROM programs WHERE code = %s", (program_code,))
+                if cursor.fetchone():
+                    raise ValueError('Program code already exists')
 
-            cursor.execute("SELECT code FROM colleges WHERE code = %s", (college_code,))
-            if not cursor.fetchone():
-                raise ValueError('College does not exist')
+                if not refdata.college_exists(college_code):
+                    raise ValueError('College does not exist')
 
-            cursor.execute("""
-                INSERT INTO programs (code, name, college_code)
-                VALUES (%s, %s, %s)
-                RETURNING *
-            """, (program_code, name, college_code))
-            
-            program = cursor.fetchone()
-            conn.commit()
-            return program
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+                cursor.execute("""
+                    INSERT INTO programs (code, name, college_code)
+                    VALUES (%s, %s, %s)
+                    RETURNING *
+                """, (program_code, name, college_code))
+
+                program = cursor.fetchone()
+                conn.commit()
+                data_changed.send('programs')
+                return program
+            except psycopg2.errors.ForeignKeyViolation:
+                # College deleted after the reference data was loaded
+                conn.rollback()
+                raise ValueError('College does not exist')
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     @staticmethod
     def update_program(program, data):
         """Updates an existing program."""
         old_code = program['code']
         new_code = data.get('code', old_code).strip().upper()
-        
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            if new_code != old_code:
-                cursor.execute("SELECT code FROM programs WHERE code = %s", (new_code,))
-                if cursor.fetchone():
-                    raise ValueError('Program code already exists')
-            
-            # Check college if changing
-            college_code = data.get('college_code', program['college_code']).strip().upper()
-            if college_code != program['college_code']:
-                cursor.execute("SELECT code FROM colleges WHERE code = %s", (college_code,))
-                if not cursor.fetchone():
+
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                if new_code != old_code:
+                    cursor.execute("SELECT code FROM programs WHERE code = %s", (new_code,))
+                    if cursor.fetchone():
+                        raise ValueError('Program code already exists')
+
+                # Check college if changing
+                college_code = data.get('college_code', program['college_code']).strip().upper()
+                if college_code != program['college_code'] and not refdata.college_exists(college_code):
                     raise ValueError('College does not exist')
 
-            cursor.execute("""
-                UPDATE programs 
-                SET code = %s, name = %s, college_code = %s
-                WHERE code = %s
-                RETURNING *
-            """, (
-                new_code,
-                data.get('name', program['name']).strip(),
-                college_code,
-                old_code
-            ))
-            
-            updated_program = cursor.fetchone()
-            conn.commit()
-            return updated_program
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+                cursor.execute("""
+                    UPDATE programs
+                    SET code = %s, name = %s, college_code = %s
+                    WHERE code = %s
+                    RETURNING *
+                """, (
+                    new_code,
+                    data.get('name', program['name']).strip(),
+                    college_code,
+                    old_code
+                ))
+
+                updated_program = cursor.fetchone()
+                conn.commit()
+                data_changed.send('programs')
+                return updated_program
+            except psycopg2.errors.ForeignKeyViolation:
+                conn.rollback()
+                raise ValueError('College does not exist')
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     @staticmethod
     def delete_program(program):
         """Deletes a program."""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
+        with get_connection() as conn, conn.cursor() as cursor:
             cursor.execute("DELETE FROM programs WHERE code = %s", (program['code'],))
             conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
+            data_changed.send('programs')
 
     @staticmethod
     def bulk_delete_programs(codes):
         """Deletes multiple programs by their codes."""
         if not codes:
             raise ValueError('No codes provided')
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
+
+        with get_connection() as conn, conn.cursor() as cursor:
             cursor.execute("DELETE FROM programs WHERE code IN %s", (tuple(codes),))
             num_deleted = cursor.rowcount
             conn.commit()
+            data_changed.send('programs')
             return num_deleted
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
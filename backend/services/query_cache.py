@@ -0,0 +1,138 @@
+"""
+Result cache for the service-layer list queries.
+
+Entries are keyed on the query's name, its normalized arguments and the
+current generation of every table it reads. A write bumps the generation
+of the table it touched (via the data_changed signal), so older entries
+can no longer be looked up and age out of the backend on their own.
+
+QUERY_CACHE_BACKEND picks the backend:
+- 'memory' (default): an LRUCache per process. Generations are also per
+  process, so writes made by other workers show up within QUERY_CACHE_TTL.
+- 'redis': a RedisCache at QUERY_CACHE_REDIS_URL. Generations live in
+  Redis too, so a write invalidates the entries of every worker at once.
+- 'none': caching is disabled.
+
+Generations only move when this process hears of a write, which can lag
+(or, with CHANGE_FEED=off, wait for the TTL). Views wrapped in
+routes.conditional.conditional_get already read the tables' versions
+from the database to build their ETag; they pass them in with
+request_versions(), and entries are then keyed on those versions, so a
+cached body is never older than the ETag it is sent with.
+"""
+import contextlib
+import contextvars
+import functools
+import hashlib
+import inspect
+import os
+import threading
+from cache import LRUCache, RedisCache, MISSING
+from signals import data_changed
+
+class QueryCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._invalidations = 0
+
+    def generations(self, tables):
+        if hasattr(self.backend, 'generations'):
+            return self.backend.generations(tables)
+        with self._lock:
+            return [self._generations.get(table, 0) for table in tables]
+
+    def invalidate(self, table):
+        if hasattr(self.backend, 'bump'):
+            self.backend.bump(table)
+        with self._lock:
+            if not hasattr(self.backend, 'bump'):
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._invalidations += 1
+
+    def stats(self):
+        stats = self.backend.stats()
+        with self._lock:
+            stats['invalidations'] = self._invalidations
+        return stats
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+def get_query_cache():
+    """Returns the process-wide QueryCache, or None when caching is disabled."""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                kind = os.getenv('QUERY_CACHE_BACKEND', 'memory')
+                ttl = float(os.getenv('QUERY_CACHE_TTL', 30))
+                if kind == 'none':
+                    return None
+                if kind == 'redis':
+                    backend = RedisCache(os.getenv('QUERY_CACHE_REDIS_URL', 'redis://localhost:6379/0'), ttl)
+                elif kind == 'memory':
+                    backend = LRUCache(int(os.getenv('QUERY_CACHE_SIZE', 1024)), ttl)
+                else:
+                    raise ValueError(f"Unknown QUERY_CACHE_BACKEND: {kind}")
+                _query_cache = QueryCache(backend)
+    return _query_cache
+
+# {table: (version, changed_at)} read from table_versions for the current request
+_request_versions = contextvars.ContextVar('request_versions', default=None)
+
+@contextlib.contextmanager
+def request_versions(versions):
+    """Keys the cached queries run inside the block on ``versions`` (see db.get_table_versions)."""
+    token = _request_versions.set(versions)
+    try:
+        yield
+    finally:
+        _request_versions.reset(token)
+
+def _generations(query_cache, tables):
+    generations = query_cache.generations(tables)
+    versions = _request_versions.get()
+    if not versions:
+        return generations
+    # Tagged so a database version never matches a process generation
+    return [('v', versions[table][0]) if table in versions else generation
+            for table, generation in zip(tables, generations)]
+
+@data_changed.connect
+def _invalidate(sender, **kwargs):
+    query_cache = get_query_cache()
+    if query_cache is not None:
+        query_cache.invalidate(sender)
+
+def cached_query(*tables):
+    """
+    Caches a query function's results until one of ``tables`` is written.
+
+    ``tables`` must list every table the result reads, including those only
+    reached through joins or trigger-maintained counters. Arguments are
+    bound to the function's signature first, so positional and keyword
+    spellings of the same call share an entry. Exceptions are not cached.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            query_cache = get_query_cache()
+            if query_cache is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = repr(sorted(bound.arguments.items()))
+            generations = _generations(query_cache, tables)
+            key = hashlib.sha1(f"{fn.__qualname__}|{generations}|{arguments}".encode()).hexdigest()
+
+            result = query_cache.backend.get(key)
+            if result is MISSING:
+                result = fn(*args, **kwargs)
+                query_cache.backend.set(key, result)
+            return result
+        return wrapper
+    return decorator
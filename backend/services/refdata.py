@@ -0,0 +1,128 @@
+"""
+Process-local copy of the program and college reference data.
+
+Programs and colleges are small and rarely change, but every student
+write used to look its program up and every student list joined both
+tables just for their names. ReferenceData keeps {code: (name,
+college_code)} for programs and {code: name} for colleges in memory,
+replaced as a whole on reload so readers never see a half-built copy.
+
+The copy is marked stale by data_changed for programs or colleges. That
+covers writes in this process and, through the change feed listener
+(change_feed.py), writes made by any other worker or client. It is then
+reloaded, in one query, by the next caller. REFDATA_TTL bounds its age
+when the change feed is off.
+
+Lookups may therefore lag a concurrent write by a moment. Callers must
+not rely on a hit alone: the foreign keys on students.program_code and
+programs.college_code remain the authority, and a miss reloads once
+before reporting that a code does not exist.
+"""
+import os
+import threading
+import time
+from db import get_connection
+from signals import data_changed
+
+REFDATA_TTL = float(os.getenv('REFDATA_TTL', 300))
+
+class Snapshot:
+    def __init__(self, programs, colleges):
+        self.programs = programs
+        self.colleges = colleges
+        self.loaded_at = time.monotonic()
+
+class ReferenceData:
+    def __init__(self, ttl=REFDATA_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stale = True
+        self._loads = 0
+
+    def invalidate(self):
+        self._stale = True
+
+    def snapshot(self):
+        """Returns the current Snapshot, reloading it first if it is stale or expired."""
+        snapshot = self._snapshot
+        if snapshot is None or self._stale or time.monotonic() - snapshot.loaded_at > self.ttl:
+            snapshot = self._reload(snapshot)
+        return snapshot
+
+    def _reload(self, seen, force=False):
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            if not force and self._snapshot is not seen and not self._stale:
+                return self._snapshot
+            # Cleared before reading, so a change made during the load marks it stale again
+            self._stale = False
+            with get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT 'p', code, name, college_code FROM programs
+                    UNION ALL
+                    SELECT 'c', code, name, NULL FROM colleges
+                """)
+                rows = cursor.fetchall()
+            programs = {code: (name, college_code) for kind, code, name, college_code in rows if kind == 'p'}
+            colleges = {code: name for kind, code, name, _ in rows if kind == 'c'}
+            self._snapshot = Snapshot(programs, colleges)
+            self._loads += 1
+            return self._snapshot
+
+    def _exists(self, table, code):
+        if code in getattr(self.snapshot(), table):
+            return True
+        # Possibly created elsewhere since the last load
+        return code in getattr(self._reload(None, force=True), table)
+
+    def program_exists(self, code):
+        return self._exists('programs', code)
+
+    def college_exists(self, code):
+        return self._exists('colleges', code)
+
+    def missing_programs(self, codes):
+        """Returns the subset of ``codes`` that name no program."""
+        missing = {code for code in codes if code not in self.snapshot().programs}
+        if missing:
+            missing = {code for code in missing if code not in self._reload(None, force=True).programs}
+        return missing
+
+    def resolve_names(self, rows, fields=('program_name', 'college_code', 'college_name'), drop_key=False):
+        """
+        Fills ``fields`` (any of program_name, college_code, college_name) in
+        each row from its program_code, as the LEFT JOINs would have, with
+        None for a missing program or college. ``rows`` are changed in place.
+        With ``drop_key`` the program_code key, selected only to resolve the
+        names, is removed afterwards.
+        """
+        snapshot = self.snapshot()
+        for row in rows:
+            program = snapshot.programs.get(row['program_code'])
+            college_code = program[1] if program else None
+            if 'program_name' in fields:
+                row['program_name'] = program[0] if program else None
+            if 'college_code' in fields:
+                row['college_code'] = college_code
+            if 'college_name' in fields:
+                row['college_name'] = snapshot.colleges.get(college_code)
+            if drop_key:
+                del row['program_code']
+        return rows
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'programs': len(snapshot.programs) if snapshot else 0,
+            'colleges': len(snapshot.colleges) if snapshot else 0,
+            'loads': self._loads,
+            'stale': self._stale,
+        }
+
+refdata = ReferenceData()
+
+@data_changed.connect
+def _invalidate(sender, **kwargs):
+    if sender in ('programs', 'colleges'):
+        refdata.invalidate()
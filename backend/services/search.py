@@ -0,0 +1,30 @@
+"""
+Helpers for the substring search used by the list endpoints.
+
+Searches are ``ILIKE '%term%'`` matches, which the pg_trgm GIN indexes
+created by init_db (and the trigram migration) can answer without a
+sequential scan. Results can be ranked with pg_trgm's word_similarity.
+"""
+
+def _escape(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def contains_pattern(term):
+    """Returns an ILIKE pattern matching ``term`` anywhere, with wildcards escaped."""
+    return f"%{_escape(term)}%"
+
+def prefix_pattern(term):
+    """Returns a LIKE pattern matching values that start with ``term``, with wildcards escaped."""
+    return f"{_escape(term)}%"
+
+def search_sql(columns):
+    """An OR of ILIKE matches over ``columns``, with one placeholder (a contains_pattern) per column."""
+    return "(" + " OR ".join(f"{column} ILIKE %s" for column in columns) + ")"
+
+def relevance_sql(columns):
+    """
+    A select-list column named ``relevance`` scoring how closely the best
+    of ``columns`` matches the search term, with one placeholder per column.
+    """
+    scores = ", ".join(f"word_similarity(%s, {column})" for column in columns)
+    return f", GREATEST({scores}) as relevance"
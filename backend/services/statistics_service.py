@@ -0,0 +1,88 @@
+from db import get_connection
+from psycopg2.extras import RealDictCursor
+from cache import TTLCache, MISSING
+from signals import data_changed
+import os
+import threading
+
+# Dashboard statistics are cached per process. Writes made through the
+# services clear the cache immediately; writes from other processes show
+# up once the TTL expires.
+_cache = TTLCache(ttl=float(os.getenv('STATISTICS_CACHE_TTL', 30)))
+
+# One round trip: every figure is a scalar subquery of a single SELECT.
+# Per-program and per-college student counts come from the
+# trigger-maintained programs.student_count column.
+STATISTICS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM students) AS total_students,
+        (SELECT COUNT(*) FROM programs) AS total_programs,
+        (SELECT COUNT(*) FROM colleges) AS total_colleges,
+        (SELECT COALESCE(json_agg(row_to_json(x)), '[]') FROM (
+            SELECT c.code, c.name, COALESCE(SUM(p.student_count), 0) AS student_count
+            FROM colleges c
+            LEFT JOIN programs p ON p.college_code = c.code
+            GROUP BY c.code, c.name
+            ORDER BY c.code
+        ) x) AS by_college,
+        (SELECT COALESCE(json_agg(row_to_json(x)), '[]') FROM (
+            SELECT code, name, college_code, student_count
+            FROM programs
+            ORDER BY code
+        ) x) AS by_program,
+        (SELECT COALESCE(json_agg(row_to_json(x)), '[]') FROM (
+            SELECT year_level, COUNT(*) AS student_count
+            FROM students
+            GROUP BY year_level
+            ORDER BY year_level
+        ) x) AS by_year_level,
+        (SELECT COALESCE(json_agg(row_to_json(x)), '[]') FROM (
+            SELECT gender, COUNT(*) AS student_count
+            FROM students
+            GROUP BY gender
+            ORDER BY gender
+        ) x) AS by_gender
+"""
+
+# Bumped by every write. A result is only cached if no write happened
+# while it was being computed, or it could outlive the invalidation.
+_generation = 0
+_generation_lock = threading.Lock()
+
+@data_changed.connect
+def _invalidate(sender, **kwargs):
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        _cache.clear()
+
+def cached_statistics():
+    """Returns the cached statistics, or MISSING."""
+    return _cache.get('statistics')
+
+def current_generation():
+    """Returns the write generation; take it before computing statistics to cache."""
+    return _generation
+
+def cache_statistics(generation, statistics):
+    """Caches ``statistics`` unless a write happened since ``generation`` was taken."""
+    with _generation_lock:
+        if generation == _generation:
+            _cache.set('statistics', statistics)
+
+class StatisticsService:
+    @staticmethod
+    def get_statistics():
+        """Returns totals and per-college/program/year level/gender breakdowns."""
+        statistics = cached_statistics()
+        if statistics is MISSING:
+            generation = current_generation()
+            statistics = StatisticsService._compute()
+            cache_statistics(generation, statistics)
+        return statistics
+
+    @staticmethod
+    def _compute():
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(STATISTICS_QUERY)
+            return dict(cursor.fetchone())
@@ -1,117 +1,117 @@
-from db import get_db_connection
-from psycopg2.extras import RealDictCursor
+from db import get_connection
+from psycopg2.extras import RealDictCursor, execute_values
+from signals import data_changed
+from services.bulk_io import CopyStream, iter_csv_rows, iter_ndjson_rows
+from services.query_cache import cached_query
+from services.refdata import refdata
+from services import list_query
+from services.list_query import Field
+import psycopg2
 import re
-import math
-from flask import request
 
 class StudentService:
+    # Join with programs and colleges only to sort or filter on their columns;
+    # otherwise their names are resolved from the reference data
+    RESOURCE = list_query.Resource(
+        'students', 'students s', 'id',
+        fields={
+            'id': Field('s.id', searchable=True, filters=list_query.EQUALITY),
+            'first_name': Field('s.first_name', searchable=True),
+            'last_name': Field('s.last_name', searchable=True),
+            'year_level': Field('s.year_level', type=int, filters=list_query.RANGE),
+            'gender': Field('s.gender', filters=list_query.EQUALITY),
+            'program_code': Field('s.program_code', filters=list_query.EQUALITY, nullable=True),
+            'photo_url': Field('s.photo_url', sortable=False),
+            'created_at': Field('s.created_at', type=list_query.timestamp, filters=list_query.RANGE),
+            'program_name': Field('p.name', join='p', nullable=True, resolved=True),
+            'college_code': Field('p.college_code', join='p', filters=list_query.EQUALITY, nullable=True, resolved=True),
+            'college_name': Field('c.name', join='c', nullable=True, resolved=True),
+        },
+        select_all='s.*',
+        joins={
+            'p': ('LEFT JOIN programs p ON s.program_code = p.code', None),
+            'c': ('LEFT JOIN colleges c ON p.college_code = c.code', 'p'),
+        },
+        resolver=refdata.resolve_names, resolver_key='program_code'
+    )
+
     @staticmethod
-    def get_all_students(search_term=None, page=None, per_page=None, sort_by='id', sort_order='asc', program_code=None, year_level=None, gender=None):
-        
-        try:
-            if program_code is None:
-                program_code = request.args.get('program_code')
-            if year_level is None:
-                year_level = request.args.get('year_level')
-            if gender is None:
-                gender = request.args.get('gender')
-        except:
-            pass
-    
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            # Join with programs and colleges to get names
-            query = """
-                SELECT s.*, p.name as program_name, c.name as college_name, p.college_code
-                FROM students s
-                LEFT JOIN programs p ON s.program_code = p.code
-                LEFT JOIN colleges c ON p.college_code = c.code
-            """
-            params = []
-            conditions = []
-            
-            if search_term:
-                conditions.append("(s.id ILIKE %s OR s.first_name ILIKE %s OR s.last_name ILIKE %s)")
-                term = f"%{search_term}%"
-                params.extend([term, term, term])
-            
-            if program_code:
-                conditions.append("s.program_code = %s")
-                params.append(program_code)
-            
-            if year_level:
-                conditions.append("s.year_level = %s")
-                params.append(int(year_level))
-            
-            if gender:
-                conditions.append("s.gender = %s")
-                params.append(gender)
-            
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-            
-            # Sorting
-            sort_map = {
-                'id': 's.id',
-                'first_name': 's.first_name',
-                'last_name': 's.last_name',
-                'year_level': 's.year_level',
-                'gender': 's.gender',
-                'program_code': 's.program_code',
-                'program_name': 'p.name',
-                'college_name': 'c.name',
-                'college_code': 'p.college_code'
-            }
-            
-            if sort_by in sort_map:
-                query += f" ORDER BY {sort_map[sort_by]} {'DESC' if sort_order == 'desc' else 'ASC'}"
-            
-            if page is not None and per_page is not None:
-                # Get total count for pagination
-                count_query = f"SELECT COUNT(*) as total FROM ({query}) as subquery"
-                cursor.execute(count_query, tuple(params))
-                total = cursor.fetchone()['total']
-                
-                # Apply limit and offset
-                query += " LIMIT %s OFFSET %s"
-                offset = (page - 1) * per_page
-                params.extend([per_page, offset])
-                
-                cursor.execute(query, tuple(params))
-                items = cursor.fetchall()
-                
-                return {
-                    'items': items,
-                    'total': total,
-                    'pages': math.ceil(total / per_page),
-                    'page': page,
-                    'per_page': per_page
-                }
-            
-            cursor.execute(query, tuple(params))
-            return cursor.fetchall()
-        finally:
-            cursor.close()
-            conn.close()
+    @cached_query('students', 'programs', 'colleges')
+    def get_all_students(search_term=None, page=None, per_page=None, sort_by='id', sort_order='asc', filters=(), page_cursor=None, count='exact', fields=None):
+        """
+        Retrieves students with search, filters and sorting.
+        Pages by OFFSET when ``page`` is given, or by keyset when ``page_cursor``
+        is given ('' for the first page); otherwise returns every row.
+        ``count`` selects how the page total is computed: 'exact', 'estimate' or 'none'.
+        With a search term, sort_by='relevance' ranks the closest matches first.
+        ``filters`` comes from list_query.parse_filters and ``fields`` is a
+        comma-separated list of fields to return (default: all).
+        Results are cached until students, programs or colleges change.
+        """
+        query = list_query.build(
+            StudentService.RESOURCE, search_term, sort_by, sort_order, filters, fields, keyset=page_cursor is not None
+        )
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            result = list_query.fetch(cursor, query, page, per_page, page_cursor, count)
+        return query.finish(result)
+
+    FACETS = ('program_code', 'college_code', 'year_level', 'gender')
 
     @staticmethod
-    def get_student_by_id(student_id):
-        """Retrieves a single student by their ID."""
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            cursor.execute("""
-                SELECT s.*, p.name as program_name, c.name as college_name, p.college_code
-                FROM students s
-                LEFT JOIN programs p ON s.program_code = p.code
-                LEFT JOIN colleges c ON p.college_code = c.code
-                WHERE s.id = %s
-            """, (student_id,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
-            conn.close()
+    @cached_query('students', 'programs', 'colleges')
+    def get_student_facets(search_term=None, filters=()):
+        """
+        Counts the students matching a list request's search and filters
+        per program, college, year level and gender, in one query (see
+        list_query.facet_counts). Cached like get_all_students, keyed by
+        the same search term and parsed filters.
+        Returns {'total': n, '<facet>': [{'value', 'count'}, ...]}, with a
+        'name' on program and college values.
+        """
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            counts, total = list_query.facet_counts(
+                cursor, StudentService.RESOURCE, StudentService.FACETS, search_term, filters
+            )
+
+        snapshot = refdata.snapshot()
+        names = {
+            'program_code': lambda code: snapshot.programs.get(code, (None,))[0],
+            'college_code': snapshot.colleges.get,
+        }
+        facets = {'total': total}
+        for facet, values in counts.items():
+            # Unassigned (NULL) values sort last
+            ordered = sorted(values.items(), key=lambda item: (item[0] is None, item[0] if item[0] is not None else ''))
+            facets[facet] = [{'value': value, 'count': count} for value, count in ordered]
+            if facet in names:
+                for entry in facets[facet]:
+                    entry['name'] = names[facet](entry['value'])
+        return facets
+
+    @staticmethod
+    def export_students(search_term=None, sort_by='id', sort_order='asc', filters=()):
+        """
+        Returns a generator of every matching student, in order (see list_query.export).
+        Raises ValueError for an unknown sort or filter before anything is read.
+        """
+        query = list_query.build(StudentService.RESOURCE, search_term, sort_by, sort_order, filters)
+        return list_query.export(query, 'student_export')
+
+    @staticmethod
+    def get_student_by_id(student_id, fields=None):
+        """
+        Retrieves a single student by their ID.
+        ``fields`` is a comma-separated list of fields to return (default: all).
+        """
+        select, body, resolve = list_query.projection(
+            StudentService.RESOURCE, list_query.parse_fields(StudentService.RESOURCE, fields)
+        )
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(f"{select} {body} WHERE s.id = %s", (student_id,))
+            student = cursor.fetchone()
+        if student is not None and resolve is not None:
+            resolve([student])
+        return student
 
     @staticmethod
     def create_student(data):
@@ -119,9 +119,6 @@ class StudentService:
         Creates a new student.
         Raises ValueError for business rule violations (e.g., missing fields, duplicates).
         """
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
         required = ['id', 'first_name', 'last_name', 'year_level', 'gender', 'program_code']
         for field in required:
             if not data.get(field):
@@ -133,40 +130,41 @@ class StudentService:
 
         program_code = data['program_code'].strip()
 
-        try:
-            # Check duplicates
-            cursor.execute("SELECT id FROM students WHERE id = %s", (student_id,))
-            if cursor.fetchone():
-                raise ValueError('Student ID already exists')
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                # Check duplicates
+                cursor.execute("SELECT id FROM students WHERE id = %s", (student_id,))
+                if cursor.fetchone():
+                    raise ValueError('Student ID already exists')
 
-            # Check program existence
-            cursor.execute("SELECT code FROM programs WHERE code = %s", (program_code,))
-            if not cursor.fetchone():
-                raise ValueError('Program does not exist')
+                if not refdata.program_exists(program_code):
+                    raise ValueError('Program does not exist')
 
-            cursor.execute("""
-                INSERT INTO students (id, first_name, last_name, year_level, gender, program_code, photo_url)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING *
-            """, (
-                student_id,
-                data['first_name'].strip(),
-                data['last_name'].strip(),
-                int(data['year_level']),
-                data['gender'],
-                program_code,
-                data.get('photo_url')
-            ))
-            
-            new_student = cursor.fetchone()
-            conn.commit()
-            return new_student
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+                cursor.execute("""
+                    INSERT INTO students (id, first_name, last_name, year_level, gender, program_code, photo_url)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING *
+                """, (
+                    student_id,
+                    data['first_name'].strip(),
+                    data['last_name'].strip(),
+                    int(data['year_level']),
+                    data['gender'],
+                    program_code,
+                    data.get('photo_url')
+                ))
+
+                new_student = cursor.fetchone()
+                conn.commit()
+                data_changed.send('students')
+                return new_student
+            except psycopg2.errors.ForeignKeyViolation:
+                # Program deleted after the reference data was loaded
+                conn.rollback()
+                raise ValueError('Program does not exist')
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     @staticmethod
     def update_student(student, data):
@@ -174,83 +172,361 @@ class StudentService:
         # 'student' is now a dict from get_student_by_id
         old_id = student['id']
         new_id = data.get('id', old_id).strip().upper()
-        
+
         if not re.match(r'^\d{4}-\d{4}$', new_id):
             raise ValueError('Student ID must follow the format NNNN-NNNN (e.g., 2021-0001)')
 
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            if new_id != old_id:
-                cursor.execute("SELECT id FROM students WHERE id = %s", (new_id,))
-                if cursor.fetchone():
-                    raise ValueError('New Student ID already exists')
-            
-            # Check program if changing
-            raw_program_code = data.get('program_code', student['program_code'])
-            program_code = raw_program_code.strip() if raw_program_code else None
-            
-            if program_code != student['program_code']:
-                if program_code:
-                    cursor.execute("SELECT code FROM programs WHERE code = %s", (program_code,))
-                    if not cursor.fetchone():
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                if new_id != old_id:
+                    cursor.execute("SELECT id FROM students WHERE id = %s", (new_id,))
+                    if cursor.fetchone():
+                        raise ValueError('New Student ID already exists')
+
+                # Check program if changing
+                raw_program_code = data.get('program_code', student['program_code'])
+                program_code = raw_program_code.strip() if raw_program_code else None
+
+                if program_code != student['program_code']:
+                    if program_code and not refdata.program_exists(program_code):
                         raise ValueError(f'Program {program_code} does not exist')
 
-            cursor.execute("""
-                UPDATE students 
-                SET id = %s, first_name = %s, last_name = %s, year_level = %s, 
-                    gender = %s, program_code = %s, photo_url = %s
-                WHERE id = %s
-                RETURNING *
-            """, (
-                new_id,
-                data.get('first_name', student['first_name']).strip(),
-                data.get('last_name', student['last_name']).strip(),
-                int(data.get('year_level', student['year_level'])),
-                data.get('gender', student['gender']),
-                program_code,
-                data.get('photo_url', student['photo_url']),
-                old_id
-            ))
-            
-            updated_student = cursor.fetchone()
-            conn.commit()
-            return updated_student
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
-            conn.close()
+                cursor.execute("""
+                    UPDATE students
+                    SET id = %s, first_name = %s, last_name = %s, year_level = %s,
+                        gender = %s, program_code = %s, photo_url = %s
+                    WHERE id = %s
+                    RETURNING *
+                """, (
+                    new_id,
+                    data.get('first_name', student['first_name']).strip(),
+                    data.get('last_name', student['last_name']).strip(),
+                    int(data.get('year_level', student['year_level'])),
+                    data.get('gender', student['gender']),
+                    program_code,
+                    data.get('photo_url', student['photo_url']),
+                    old_id
+                ))
+
+                updated_student = cursor.fetchone()
+                conn.commit()
+                data_changed.send('students')
+                return updated_student
+            except psycopg2.errors.ForeignKeyViolation:
+                conn.rollback()
+                raise ValueError(f'Program {program_code} does not exist')
+            except Exception as e:
+                conn.rollback()
+                raise e
 
     @staticmethod
     def delete_student(student):
         """Deletes a student."""
         # 'student' is a dict, we need the id
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
+        with get_connection() as conn, conn.cursor() as cursor:
             cursor.execute("DELETE FROM students WHERE id = %s", (student['id'],))
             conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
+            data_changed.send('students')
 
     @staticmethod
     def bulk_delete_students(ids):
         """Deletes multiple students by their IDs."""
         if not ids:
             raise ValueError('No student IDs provided for bulk deletion')
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
+
+        with get_connection() as conn, conn.cursor() as cursor:
             # psycopg2 handles tuple adaptation for IN clause
             cursor.execute("DELETE FROM students WHERE id IN %s", (tuple(ids),))
             num_deleted = cursor.rowcount
             conn.commit()
+            data_changed.send('students')
             return num_deleted
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
+
+    MAX_BATCH_SIZE = 5000
+    STUDENT_ID_PATTERN = re.compile(r'^\d{4}-\d{4}$')
+
+    @staticmethod
+    def _clean(value):
+        return value.strip() if isinstance(value, str) else value
+
+    @staticmethod
+    def batch_write(operations, mode='atomic'):
+        """
+        Applies a list of create/update operations in a single transaction.
+
+        Each operation is {'op': 'create', 'data': {...}} or
+        {'op': 'update', 'id': <current id>, 'data': {...}}. Existing IDs and
+        program codes are checked with one query each, then all inserts and
+        all updates are written with one statement each.
+
+        In 'atomic' mode nothing is written if any operation is invalid; in
+        'best_effort' mode the valid operations are written and the invalid
+        ones reported. Returns {'committed': bool, 'results': [...]} with one
+        result per operation, in order.
+        Raises ValueError for a malformed request.
+        """
+        if mode not in ('atomic', 'best_effort'):
+            raise ValueError('mode must be atomic or best_effort')
+        if not isinstance(operations, list) or not operations:
+            raise ValueError('No operations provided')
+        if len(operations) > StudentService.MAX_BATCH_SIZE:
+            raise ValueError(f'A batch may contain at most {StudentService.MAX_BATCH_SIZE} operations')
+
+        clean = StudentService._clean
+        results = []
+        items = []
+        for index, operation in enumerate(operations):
+            result = {'index': index, 'op': operation.get('op') if isinstance(operation, dict) else None}
+            results.append(result)
+            if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update'):
+                result['error'] = "op must be 'create' or 'update'"
+                continue
+            data = operation.get('data')
+            if not isinstance(data, dict):
+                result['error'] = 'data must be an object'
+                continue
+
+            item = {'index': index, 'op': operation['op'], 'data': data}
+            if operation['op'] == 'create':
+                missing = [field for field in ('id', 'first_name', 'last_name', 'year_level', 'gender', 'program_code') if not data.get(field)]
+                if missing:
+                    result['error'] = f'Missing required field: {missing[0]}'
+                    continue
+                item['new_id'] = str(data['id']).strip().upper()
+            else:
+                if not operation.get('id'):
+                    result['error'] = 'id is required for update'
+                    continue
+                item['old_id'] = str(operation['id']).strip().upper()
+                item['new_id'] = str(data.get('id', item['old_id'])).strip().upper()
+
+            if not StudentService.STUDENT_ID_PATTERN.match(item['new_id']):
+                result['error'] = 'Student ID must follow the format NNNN-NNNN (e.g., 2021-0001)'
+                continue
+            if 'year_level' in data:
+                try:
+                    int(data['year_level'])
+                except (TypeError, ValueError):
+                    result['error'] = 'Year level must be a whole number'
+                    continue
+            result['id'] = item['new_id']
+            items.append(item)
+
+        referenced_ids = {item['new_id'] for item in items} | {item['old_id'] for item in items if 'old_id' in item}
+        program_codes = {clean(item['data']['program_code']) for item in items if item['data'].get('program_code')}
+
+        # Program codes are checked against the reference data, IDs with one query
+        known_programs = program_codes - refdata.missing_programs(program_codes)
+
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                existing = {}
+                if referenced_ids:
+                    # Locked until commit, so the rows checked here are the rows written
+                    cursor.execute("SELECT * FROM students WHERE id = ANY(%s) FOR UPDATE", (list(referenced_ids),))
+                    existing = {row['id']: row for row in cursor.fetchall()}
+
+                inserts, updates = [], []
+                claimed = set()
+                for item in items:
+                    result, data, new_id = results[item['index']], item['data'], item['new_id']
+                    current = existing.get(item.get('old_id'), {})
+                    if item['op'] == 'update' and not current:
+                        result['error'] = 'Student not found'
+                    elif new_id in claimed or item.get('old_id') in claimed:
+                        result['error'] = 'Student is targeted by another operation in this batch'
+                    elif new_id in existing and new_id != item.get('old_id'):
+                        result['error'] = 'Student ID already exists'
+                    else:
+                        raw_program_code = data.get('program_code', current.get('program_code'))
+                        program_code = clean(raw_program_code) or None
+                        if program_code and program_code not in known_programs and program_code != current.get('program_code'):
+                            result['error'] = f'Program {program_code} does not exist'
+                        else:
+                            claimed.add(new_id)
+                            if item.get('old_id'):
+                                claimed.add(item['old_id'])
+                            row = (
+                                new_id,
+                                clean(data.get('first_name', current.get('first_name'))),
+                                clean(data.get('last_name', current.get('last_name'))),
+                                int(data.get('year_level', current.get('year_level'))),
+                                data.get('gender', current.get('gender')),
+                                program_code,
+                                data.get('photo_url', current.get('photo_url'))
+                            )
+                            if item['op'] == 'create':
+                                inserts.append(row)
+                            else:
+                                updates.append((item['old_id'],) + row)
+
+                failed = any('error' in result for result in results)
+                if failed and mode == 'atomic':
+                    conn.rollback()
+                    for result in results:
+                        result['status'] = 'error' if 'error' in result else 'skipped'
+                    return {'committed': False, 'results': results}
+
+                written = {}
+                if inserts:
+                    rows = execute_values(cursor, """
+                        INSERT INTO students (id, first_name, last_name, year_level, gender, program_code, photo_url)
+                        VALUES %s
+                        RETURNING *
+                    """, inserts, page_size=len(inserts), fetch=True)
+                    written.update((row['id'], ('created', row)) for row in rows)
+                if updates:
+                    rows = execute_values(cursor, """
+                        UPDATE students s SET
+                            id = v.new_id, first_name = v.first_name, last_name = v.last_name,
+                            year_level = v.year_level, gender = v.gender,
+                            program_code = v.program_code, photo_url = v.photo_url
+                        FROM (VALUES %s) AS v(old_id, new_id, first_name, last_name, year_level, gender, program_code, photo_url)
+                        WHERE s.id = v.old_id
+                        RETURNING s.*
+                    """, updates, template="(%s, %s, %s, %s, %s::int, %s, %s, %s)", page_size=len(updates), fetch=True)
+                    written.update((row['id'], ('updated', row)) for row in rows)
+
+                conn.commit()
+                if written:
+                    data_changed.send('students')
+            except psycopg2.errors.ForeignKeyViolation:
+                conn.rollback()
+                raise ValueError('A program referenced by this batch no longer exists')
+            except psycopg2.errors.UniqueViolation:
+                conn.rollback()
+                raise ValueError('A student ID in this batch was created by another request')
+            except Exception as e:
+                conn.rollback()
+                raise e
+
+        for result in results:
+            if 'error' not in result and result['id'] not in written:
+                result['error'] = 'Student was changed by another request'
+            if 'error' in result:
+                result['status'] = 'error'
+            else:
+                result['status'], result['student'] = written[result['id']]
+        return {'committed': True, 'results': results}
+
+    IMPORT_COLUMNS = ['id', 'first_name', 'last_name', 'year_level', 'gender', 'program_code', 'photo_url']
+    MAX_REPORTED_ERRORS = 1000
+
+    @staticmethod
+    def import_students(stream, file_format='csv', on_error='skip'):
+        """
+        Creates or updates students from a CSV (with header) or NDJSON stream.
+
+        Rows are streamed into a temporary staging table with COPY, validated
+        set-wise in SQL and upserted by ID in a single transaction. Invalid
+        rows are skipped and reported; with on_error='abort' any invalid row
+        rolls the whole import back.
+        Raises ValueError for an unsupported format or option.
+        """
+        if file_format not in ('csv', 'ndjson'):
+            raise ValueError('format must be csv or ndjson')
+        if on_error not in ('skip', 'abort'):
+            raise ValueError('on_error must be skip or abort')
+
+        columns = StudentService.IMPORT_COLUMNS
+        if file_format == 'csv':
+            rows = iter_csv_rows(stream, columns)
+        else:
+            rows = iter_ndjson_rows(stream, columns)
+
+        required = ['id', 'first_name', 'last_name', 'year_level', 'gender', 'program_code']
+        missing_checks = "\n".join(
+            f"WHEN i.{field} IS NULL THEN 'Missing required field: {field}'" for field in required
+        )
+
+        with get_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            try:
+                cursor.execute("""
+                    CREATE TEMP TABLE student_import (
+                        line_no INT, id TEXT, first_name TEXT, last_name TEXT, year_level TEXT,
+                        gender TEXT, program_code TEXT, photo_url TEXT, parse_error TEXT, error TEXT
+                    ) ON COMMIT DROP
+                """)
+                staged = ['line_no'] + columns + ['parse_error']
+                cursor.copy_expert(
+                    f"COPY student_import ({', '.join(staged)}) FROM STDIN WITH (FORMAT csv)",
+                    CopyStream(rows, staged)
+                )
+
+                # Same normalisation as create_student, applied to every row at once
+                cursor.execute("""
+                    UPDATE student_import SET
+                        id = NULLIF(upper(btrim(id)), ''),
+                        first_name = NULLIF(btrim(first_name), ''),
+                        last_name = NULLIF(btrim(last_name), ''),
+                        year_level = NULLIF(btrim(year_level), ''),
+                        gender = NULLIF(gender, ''),
+                        program_code = NULLIF(btrim(program_code), ''),
+                        photo_url = NULLIF(photo_url, '')
+                """)
+                cursor.execute(f"""
+                    UPDATE student_import i SET error = checked.error
+                    FROM (
+                        SELECT i.line_no, CASE
+                            WHEN i.parse_error IS NOT NULL THEN i.parse_error
+                            {missing_checks}
+                            WHEN i.id !~ '^[0-9]{{4}}-[0-9]{{4}}$'
+                                THEN 'Student ID must follow the format NNNN-NNNN (e.g., 2021-0001)'
+                            WHEN i.year_level !~ '^[0-9]{{1,4}}$' THEN 'Year level must be a whole number'
+                            WHEN p.code IS NULL THEN 'Program does not exist'
+                            WHEN COUNT(*) OVER (PARTITION BY i.id) > 1 THEN 'Student ID appears more than once in the file'
+                        END AS error
+                        FROM student_import i
+                        LEFT JOIN programs p ON p.code = i.program_code
+                    ) checked
+                    WHERE i.line_no = checked.line_no AND checked.error IS NOT NULL
+                """)
+
+                cursor.execute("SELECT COUNT(*) AS failed FROM student_import WHERE error IS NOT NULL")
+                failed = cursor.fetchone()['failed']
+                cursor.execute("""
+                    SELECT line_no AS line, id, error FROM student_import
+                    WHERE error IS NOT NULL ORDER BY line_no LIMIT %s
+                """, (StudentService.MAX_REPORTED_ERRORS,))
+                errors = cursor.fetchall()
+
+                created = updated = 0
+                aborted = failed > 0 and on_error == 'abort'
+                if aborted:
+                    conn.rollback()
+                else:
+                    cursor.execute("""
+                        WITH upserted AS (
+                            INSERT INTO students (id, first_name, last_name, year_level, gender, program_code, photo_url)
+                            SELECT id, first_name, last_name, year_level::int, gender, program_code, photo_url
+                            FROM student_import
+                            WHERE error IS NULL
+                            ON CONFLICT (id) DO UPDATE SET
+                                first_name = EXCLUDED.first_name,
+                                last_name = EXCLUDED.last_name,
+                                year_level = EXCLUDED.year_level,
+                                gender = EXCLUDED.gender,
+                                program_code = EXCLUDED.program_code,
+                                photo_url = COALESCE(EXCLUDED.photo_url, students.photo_url)
+                            RETURNING (xmax = 0) AS inserted
+                        )
+                        SELECT COUNT(*) FILTER (WHERE inserted) AS created,
+                               COUNT(*) FILTER (WHERE NOT inserted) AS updated
+                        FROM upserted
+                    """)
+                    result = cursor.fetchone()
+                    created, updated = result['created'], result['updated']
+                    conn.commit()
+                    data_changed.send('students')
+
+                return {
+                    'created': created,
+                    'updated': updated,
+                    'failed': failed,
+                    'aborted': aborted,
+                    'errors': errors,
+                    'errors_truncated': failed > len(errors)
+                }
+            except Exception as e:
+                conn.rollback()
+                raise e
@@ -0,0 +1,9 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent by the services after a write to a table commits, with the table name
+# as the sender. Writes can cascade: a program rename also rewrites
+# students.program_code, so receivers must account for the tables they
+# read, not only the one named here.
+data_changed = _signals.signal('data-changed')
@@ -0,0 +1,77 @@
+import contextlib
+import importlib.util
+import os
+import pytest
+import services.student_service
+from services.refdata import Snapshot, refdata
+
+# Smoke tests for the benchmark scripts: each runs its measured query
+# function against a recording connection, so a change to the service
+# signatures it calls fails here instead of mid-benchmark.
+# Usage: python -m pytest test_benchmarks.py
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+class RecordingCursor:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+class RecordingConnection:
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, **kwargs):
+        return RecordingCursor(self.executed)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def connection(monkeypatch):
+    conn = RecordingConnection()
+    monkeypatch.setattr(services.student_service, 'get_connection', lambda: contextlib.nullcontext(conn))
+    monkeypatch.setattr(refdata, 'snapshot', lambda: Snapshot({}, {}))
+    return conn
+
+def load_benchmark(monkeypatch, name):
+    # The scripts set environment variables at import; keep them to this test
+    monkeypatch.setattr(os, 'environ', dict(os.environ))
+    monkeypatch.syspath_prepend(BENCH_DIR)
+    spec = importlib.util.spec_from_file_location(f'benchmarks.{name}', os.path.join(BENCH_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_search_latency_query_runs(monkeypatch, connection):
+    search_latency = load_benchmark(monkeypatch, 'search_latency')
+    for term in search_latency.TERMS:
+        page = search_latency.search(term)
+        assert page['items'] == [] and page['total'] == 0
+    assert len(connection.executed) == len(search_latency.TERMS)
+    assert all('ILIKE' in sql for sql, _ in connection.executed)
+
+def test_seed_query_binds_its_parameters(monkeypatch):
+    load_benchmark(monkeypatch, 'search_latency')
+    import seed
+    conn = RecordingConnection()
+    monkeypatch.setattr(seed, 'get_db_connection', lambda: conn)
+    seed.grow_students(0, 100, programs=12)
+    (insert, params), _ = conn.executed
+    # psycopg2 expands the parameters with %-formatting; a bare % breaks it
+    sql = insert % params
+    assert 'generate_series(0, 99)' in sql and "'P' || (1 + g % 12)" in sql
@@ -0,0 +1,72 @@
+import pytest
+from services import list_query
+from services.student_service import StudentService
+
+# Tests for the GROUPING SETS facet query, run against a recording cursor
+# instead of a database.
+# Usage: python -m pytest test_facets.py
+
+STUDENTS = StudentService.RESOURCE
+
+class RecordingCursor:
+    """Records the executed statement and returns canned rows."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = None
+
+    def execute(self, sql, params):
+        self.executed = (sql, params)
+
+    def fetchall(self):
+        return self.rows
+
+def _row(grouping_set, total=0, **values):
+    row = {'grouping_set': grouping_set, 'total': total}
+    for name in ('program_code', 'gender'):
+        row[name] = values.get(name)
+        row[f'{name}_count'] = values.get(f'{name}_count', 0)
+    return row
+
+def test_facets_share_one_grouping_sets_query():
+    sql, slots = list_query._compile_facets(STUDENTS, ('program_code', 'gender'), (), False)
+    assert sql.count('SELECT') == 1
+    assert 'GROUP BY GROUPING SETS ((s.program_code), (s.gender), ())' in sql
+    assert 'JOIN' not in sql and slots == ()
+
+def test_a_facets_own_filter_only_applies_to_the_other_facets():
+    sql, slots = list_query._compile_facets(
+        STUDENTS, ('program_code', 'gender'), (('gender', 'in'), ('year_level', 'gte')), True
+    )
+    # gender narrows the program counts and the total, not the gender counts
+    assert 'COUNT(*) FILTER (WHERE s.gender = ANY (%s)) AS program_code_count' in sql
+    assert 'COUNT(*) AS gender_count' in sql
+    assert 'COUNT(*) FILTER (WHERE s.gender = ANY (%s)) AS total' in sql
+    # year_level is not a facet here, so it is part of the WHERE clause
+    assert 'WHERE (s.id ILIKE %s OR s.first_name ILIKE %s OR s.last_name ILIKE %s) AND s.year_level >= %s' in sql
+    # Slot 0 is the search pattern, slot n the n-th filter
+    assert slots == (1, 1, 0, 0, 0, 2)
+
+def test_facet_counts_binds_values_and_decodes_grouping_sets():
+    cursor = RecordingCursor([
+        # GROUPING() sets one bit per facet left out, the first facet most significant
+        _row(0b01, program_code='BSCS', program_code_count=7),
+        _row(0b01, program_code='BSIT', program_code_count=0),
+        _row(0b10, gender='Female', gender_count=5),
+        _row(0b11, total=4),
+    ])
+    counts, total = list_query.facet_counts(
+        cursor, STUDENTS, ('program_code', 'gender'), 'ana',
+        (('gender', 'in', ('Female',)), ('year_level', 'gte', 2))
+    )
+    assert counts == {'program_code': {'BSCS': 7}, 'gender': {'Female': 5}}
+    assert total == 4
+    sql, params = cursor.executed
+    assert params == (['Female'], ['Female'], '%ana%', '%ana%', '%ana%', 2)
+
+def test_facet_counts_rejects_unknown_facets_and_filters():
+    cursor = RecordingCursor([])
+    with pytest.raises(ValueError):
+        list_query.facet_counts(cursor, STUDENTS, ('program_code', 'nope'))
+    with pytest.raises(ValueError):
+        list_query.facet_counts(cursor, STUDENTS, ('gender',), filters=(('first_name', 'eq', 'Ana'),))
+    assert cursor.executed is None
@@ -0,0 +1,132 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+from services import list_query
+from services.pagination import check_page, decode_cursor, encode_cursor, keyset_condition
+from services.student_service import StudentService
+
+# Pure query-building tests: nothing here opens a database connection.
+# The routes answer every ValueError raised below with a 400.
+# Usage: python -m pytest test_list_query.py
+
+STUDENTS = StudentService.RESOURCE
+
+def test_parse_sort_appends_key_as_tie_breaker():
+    assert list_query.parse_sort(STUDENTS, '-year_level,last_name') == (
+        ('year_level', True), ('last_name', False), ('id', False)
+    )
+    # The key follows the direction of the last field before it
+    assert list_query.parse_sort(STUDENTS, 'last_name', 'desc') == (('last_name', True), ('id', True))
+    assert list_query.parse_sort(STUDENTS, None) == (('id', False),)
+
+@pytest.mark.parametrize('sort_by', ['nope', 'photo_url', 'year_level,-nope'])
+def test_parse_sort_rejects_unknown_or_unsortable_fields(sort_by):
+    with pytest.raises(ValueError):
+        list_query.parse_sort(STUDENTS, sort_by)
+
+def test_parse_filters_reads_every_form():
+    args = MultiDict([
+        ('year_level>', '2'),       # year_level>=2
+        ('year_level<4', ''),       # year_level<4
+        ('gender', 'Male'),
+        ('gender', 'Female'),
+        ('program_code[in]', 'BSCS,BSIT'),
+        ('page', '1'),              # not a filter
+        ('search', 'ana'),
+    ])
+    assert list_query.parse_filters(STUDENTS, args) == (
+        ('gender', 'in', ('Female', 'Male')),
+        ('program_code', 'in', ('BSCS', 'BSIT')),
+        ('year_level', 'gte', 2),
+        ('year_level', 'lt', 4),
+    )
+
+def test_parse_filters_converts_timestamps():
+    filters = list_query.parse_filters(STUDENTS, MultiDict({'created_at[gte]': '2024-06-01'}))
+    assert filters[0][2].isoformat() == '2024-06-01T00:00:00'
+
+@pytest.mark.parametrize('args', [
+    {'year_level[gte]': 'three'},
+    {'created_at[gte]': 'foo'},
+    {'created_at[lt]': '2024-06-01T00:00Z'},
+    {'gender[gt]': 'Male'},
+    {'year_level[like]': '3'},
+])
+def test_parse_filters_rejects_bad_input(args):
+    with pytest.raises(ValueError):
+        list_query.parse_filters(STUDENTS, MultiDict(args))
+
+def test_parse_filters_caps_in_lists():
+    values = ','.join(str(n) for n in range(list_query.MAX_IN_VALUES + 1))
+    with pytest.raises(ValueError):
+        list_query.parse_filters(STUDENTS, MultiDict({'year_level[in]': values}))
+
+@pytest.mark.parametrize('kwargs', [
+    {'sort_by': 'nope'},
+    {'fields': 'id,nope'},
+    {'filters': (('first_name', 'eq', 'Ana'),)},
+])
+def test_build_rejects_unknown_fields(kwargs):
+    with pytest.raises(ValueError):
+        list_query.build(STUDENTS, **kwargs)
+
+def test_build_compiles_each_shape_once():
+    first = list_query.build(STUDENTS, 'ana', 'last_name', filters=(('year_level', 'gte', 2),))
+    second = list_query.build(STUDENTS, 'jose', 'last_name', filters=(('year_level', 'gte', 4),))
+    assert first.select is second.select and first.conditions is second.conditions
+    assert first.params == ['%ana%'] * 3 + [2]
+    assert second.params == ['%jose%'] * 3 + [4]
+
+def test_build_joins_only_to_sort_or_filter():
+    listed = list_query.build(STUDENTS, fields='id,program_name')
+    assert 'JOIN' not in listed.body and listed.resolve is not None
+    sorted_by_name = list_query.build(STUDENTS, sort_by='program_name', fields='id,program_name')
+    assert 'LEFT JOIN programs p' in sorted_by_name.body and sorted_by_name.resolve is None
+
+def test_build_escapes_search_wildcards():
+    assert list_query.build(STUDENTS, '50%_').params == ['%50\\%\\_%'] * 3
+
+def _order(sort_by):
+    return list_query.build(STUDENTS, sort_by=sort_by, keyset=True).order
+
+def test_cursor_round_trip_across_sort_columns():
+    order = _order('-year_level,last_name')
+    values = [3, 'Cruz', '2024-0001']
+    assert decode_cursor(encode_cursor(order, values), order) == values
+    assert decode_cursor('', order) is None
+
+def test_cursor_rejects_another_sort_or_garbage():
+    token = encode_cursor(_order('-year_level,last_name'), [3, 'Cruz', '2024-0001'])
+    with pytest.raises(ValueError):
+        decode_cursor(token, _order('year_level,last_name'))
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', _order('-year_level,last_name'))
+
+def test_keyset_condition_uses_a_row_comparison_for_one_direction():
+    assert keyset_condition(_order('-year_level,-id'), [3, '2024-0001']) == (
+        '(s.year_level, s.id) < (%s, %s)', [3, '2024-0001']
+    )
+    assert keyset_condition(_order('id'), ['2024-0001']) == ('s.id > %s', ['2024-0001'])
+
+def test_keyset_condition_chains_mixed_directions():
+    assert keyset_condition(_order('-year_level,last_name'), [3, 'Cruz', '2024-0001']) == (
+        '(s.year_level < %s OR (s.year_level = %s AND (s.last_name > %s OR (s.last_name = %s AND s.id > %s))))',
+        [3, 3, 'Cruz', 'Cruz', '2024-0001'],
+    )
+
+def test_keyset_condition_places_nulls_last_when_ascending():
+    order = _order('program_code')
+    condition, params = keyset_condition(order, ['BSCS', '2024-0001'])
+    assert condition == '((s.program_code > %s OR s.program_code IS NULL) OR (s.program_code = %s AND s.id > %s))'
+    assert params == ['BSCS', 'BSCS', '2024-0001']
+    # Past the last non-null value only the NULL rows remain
+    condition, params = keyset_condition(order, [None, '2024-0001'])
+    assert condition == '(s.program_code IS NULL AND s.id > %s)' and params == ['2024-0001']
+
+@pytest.mark.parametrize('page, per_page', [(1, 0), (1, -5), (0, 10), (-1, 10), (None, 0)])
+def test_check_page_rejects_values_below_one(page, per_page):
+    with pytest.raises(ValueError):
+        check_page(page, per_page)
+
+def test_check_page_accepts_the_keyset_path():
+    check_page(None, 1)
+    check_page(3, 50)
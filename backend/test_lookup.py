@@ -0,0 +1,84 @@
+import pytest
+from services import lookup_service
+from services.lookup_service import LookupService, PrefixIndex
+from services.refdata import Snapshot
+
+# Tests for the in-memory typeahead index and the lookup parameters.
+# Usage: python -m pytest test_lookup.py
+
+PROGRAMS = {
+    'BSCS': ('Bachelor of Science in Computer Science', 'CCS'),
+    'BSIT': ('Bachelor of Science in Information Technology', 'CCS'),
+    'BSCA': ('Bachelor of Science in Accountancy', 'CBAA'),
+    'CS': ('Computer Studies', 'CCS'),
+}
+COLLEGES = {'CCS': 'College of Computer Studies', 'CBAA': 'College of Business Administration and Accountancy'}
+
+@pytest.fixture
+def programs():
+    return PrefixIndex({code: name for code, (name, _) in PROGRAMS.items()})
+
+def test_exact_code_then_code_then_name_then_word_matches(programs):
+    assert programs.search('cs', 10) == ['CS']
+    assert programs.search('bsc', 10) == ['BSCA', 'BSCS']
+    # "computer studies" starts with it; BSCS only has it as a later word
+    assert programs.search('computer', 10) == ['CS', 'BSCS']
+
+def test_each_code_is_returned_once(programs):
+    # BSCS matches by code, name and several words
+    assert programs.search('b', 10) == ['BSCA', 'BSCS', 'BSIT']
+
+def test_prefix_boundaries(programs):
+    assert programs.search('', 10) == ['BSCA', 'BSCS', 'BSIT', 'CS']
+    assert programs.search('bsit', 10) == ['BSIT']
+    assert programs.search('bsitx', 10) == []
+    # Sorts between entries, and past the last one
+    assert programs.search('bsd', 10) == []
+    assert programs.search('zzz', 10) == []
+    assert programs.search('technology', 10) == ['BSIT']
+    assert PrefixIndex({}).search('a', 10) == []
+
+def test_limit(programs):
+    assert programs.search('b', 2) == ['BSCA', 'BSCS']
+
+def test_multi_word_prefixes_match_names(programs):
+    assert programs.search('bachelor of science in c', 10) == ['BSCS']
+    assert programs.search('science in a', 10) == []
+
+@pytest.mark.parametrize('limit, expected', [
+    (None, lookup_service.DEFAULT_LIMIT),
+    ('', lookup_service.DEFAULT_LIMIT),
+    ('5', 5),
+    ('0', 1),
+    ('10000', lookup_service.MAX_LIMIT),
+])
+def test_parse_limit_clamps(limit, expected):
+    assert LookupService.parse_limit(limit) == expected
+
+def test_parse_limit_rejects_non_numbers():
+    with pytest.raises(ValueError):
+        LookupService.parse_limit('ten')
+
+def test_parse_types():
+    assert LookupService.parse_types('') == lookup_service.TYPES
+    assert LookupService.parse_types('colleges, programs') == ('programs', 'colleges')
+    with pytest.raises(ValueError):
+        LookupService.parse_types('programs,teachers')
+
+def test_lookup_from_reference_data(monkeypatch):
+    monkeypatch.setattr(lookup_service.refdata, 'snapshot', lambda: Snapshot(PROGRAMS, COLLEGES))
+    results = LookupService.lookup('  Computer   ', ('programs', 'colleges'), 5)
+    assert results == {
+        'programs': [
+            {'code': 'CS', 'name': 'Computer Studies', 'college_code': 'CCS'},
+            {'code': 'BSCS', 'name': 'Bachelor of Science in Computer Science', 'college_code': 'CCS'},
+        ],
+        'colleges': [{'code': 'CCS', 'name': 'College of Computer Studies'}],
+    }
+
+def test_blank_lookup_returns_nothing_without_queries(monkeypatch):
+    def fail(*args):
+        raise AssertionError('no lookup expected')
+    monkeypatch.setattr(lookup_service.refdata, 'snapshot', fail)
+    monkeypatch.setattr(LookupService, 'lookup_students', fail)
+    assert LookupService.lookup('   ') == {'students': [], 'programs': [], 'colleges': []}
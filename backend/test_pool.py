@@ -0,0 +1,29 @@
+import pytest
+from psycopg2 import extensions
+from db import ConnectionPool, PoolClosed
+
+# Tests for ConnectionPool, run against fake connections instead of a database.
+# Usage: python -m pytest test_pool.py
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+def test_closeall_closes_idle_and_returned_connections():
+    pool = ConnectionPool(minconn=0, maxconn=2, connect=FakeConnection)
+    idle, checked_out = pool.getconn(), pool.getconn()
+    pool.putconn(idle)
+    pool.closeall()
+    assert idle.closed
+    assert pool.stats()['size'] == 1
+    pool.putconn(checked_out)
+    assert checked_out.closed
+    assert pool.stats()['size'] == 0 and pool.stats()['idle'] == 0
+    with pytest.raises(PoolClosed):
+        pool.getconn()
@@ -0,0 +1,37 @@
+import pytest
+from cache import LRUCache
+from services import query_cache
+from services.query_cache import QueryCache, cached_query, request_versions
+
+# Tests for the query result cache keys.
+# Usage: python -m pytest test_query_cache.py
+
+@pytest.fixture
+def calls(monkeypatch):
+    monkeypatch.setattr(query_cache, '_query_cache', QueryCache(LRUCache(16, 60)))
+    return []
+
+def test_entries_follow_the_request_table_versions(calls):
+    @cached_query('students', 'programs')
+    def list_students(search_term=None):
+        calls.append(search_term)
+        return len(calls)
+
+    with request_versions({'students': (1, None), 'programs': (1, None)}):
+        assert list_students('ana') == 1
+        assert list_students(search_term='ana') == 1
+    # Written elsewhere: the database version moved before this process heard of it
+    with request_versions({'students': (2, None), 'programs': (1, None)}):
+        assert list_students('ana') == 2
+    assert calls == ['ana', 'ana']
+
+def test_local_generations_apply_without_request_versions(calls):
+    @cached_query('students')
+    def list_students():
+        calls.append(1)
+        return len(calls)
+
+    assert list_students() == 1
+    assert list_students() == 1
+    query_cache.get_query_cache().invalidate('students')
+    assert list_students() == 2
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers.
+
+    flask --app wsgi init-db          # once per deploy
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import create_app
+
+app = create_app()